@@ -0,0 +1,72 @@
+import queue
+import threading
+import tkinter as tk
+
+# ==== Chạy tác vụ nặng ngoài luồng Tk ====
+# Tác vụ chạy trên luồng phụ, gửi tiến độ/kết quả qua queue; luồng Tk đọc queue
+# bằng after() nên giao diện không bị treo. Mỗi runner chỉ chạy một tác vụ tại một thời điểm.
+
+class JobCancelled(Exception):
+    pass
+
+class BackgroundRunner:
+    def __init__(self, widget, poll_ms=50):
+        self.widget = widget
+        self.poll_ms = poll_ms
+        self.queue = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.busy = False
+        self.callbacks = {}
+
+    def start(self, job, on_done, on_error=None, on_progress=None, on_finish=None):
+        # job(progress, cancel_event): progress(fraction, text) với fraction trong [0, 1] hoặc None
+        if self.busy:
+            return False
+        self.busy = True
+        self.cancel_event = threading.Event()
+        self.callbacks = {"done": on_done, "error": on_error, "progress": on_progress, "finish": on_finish}
+        threading.Thread(target=self._run, args=(job, self.cancel_event), daemon=True).start()
+        self.widget.after(self.poll_ms, self._poll)
+        return True
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def _run(self, job, cancel_event):
+        def progress(fraction, text=None):
+            if cancel_event.is_set():
+                raise JobCancelled()
+            self.queue.put(("progress", (fraction, text)))
+        try:
+            result = job(progress, cancel_event)
+            if cancel_event.is_set():
+                raise JobCancelled()
+            self.queue.put(("done", result))
+        except JobCancelled:
+            self.queue.put(("cancelled", None))
+        except Exception as ex:
+            self.queue.put(("error", ex))
+
+    def _poll(self):
+        try:
+            while True:
+                kind, payload = self.queue.get_nowait()
+                if kind == "progress":
+                    if self.callbacks["progress"]:
+                        self.callbacks["progress"](*payload)
+                    continue
+                self.busy = False
+                if kind == "done":
+                    self.callbacks["done"](payload)
+                elif kind == "error" and self.callbacks["error"]:
+                    self.callbacks["error"](payload)
+                if self.callbacks["finish"]:
+                    self.callbacks["finish"](kind)
+                return
+        except queue.Empty:
+            pass
+        try:
+            self.widget.after(self.poll_ms, self._poll)
+        except tk.TclError:
+            # Cửa sổ đã đóng
+            self.busy = False
@@ -0,0 +1,170 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from playfair_core import get_cipher, playfair_process_file
+from rsa_core import (BINARY_HEADER, crt_params, generate_keys, generate_large_primes, is_probable_prime,
+                      record_body_size, rsa_block_size, rsa_decrypt_bytes, rsa_encrypt_bytes)
+
+# ==== Chế độ dòng lệnh: mã hóa/giải mã cả thư mục ====
+# Không cần màn hình: chỉ dùng playfair_core / rsa_core.
+#   python batch_cli.py playfair encrypt SRC DST --key KEYWORD
+#   python batch_cli.py rsa keygen --bits 2048 --key-file key.json
+#   python batch_cli.py rsa encrypt SRC DST --key-file key.json
+
+ENC_SUFFIX = ".enc"
+RSA_READ_BLOCKS = 1024  # số khối RSA mỗi lần đọc file
+
+def output_path(src, src_root, dst_root, decrypt):
+    rel = os.path.relpath(src, src_root)
+    if not decrypt:
+        rel += ENC_SUFFIX
+    elif rel.endswith(ENC_SUFFIX):
+        rel = rel[:-len(ENC_SUFFIX)]
+    else:
+        rel += ".dec"
+    return os.path.join(dst_root, rel)
+
+def walk_files(root):
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            yield os.path.join(dirpath, name)
+
+# ==== Xử lý từng file (chạy trong tiến trình con) ====
+def playfair_file(src, dst, decrypt, key, size):
+    # Đọc bằng latin-1 (như container.py): mỗi byte là một ký tự nên file không phải UTF-8
+    # vẫn đọc được; chỉ chữ cái/chữ số ASCII đi vào ma trận, phần còn lại bị bỏ khi chuẩn hóa
+    playfair_process_file(src, dst, get_cipher(key, size), decrypt, encoding='latin-1')
+
+def rsa_encrypt_file(src, dst, e, n):
+    # Đọc từng đoạn đủ RSA_READ_BLOCKS khối, mỗi đoạn thành một bản mã nhị phân ghi nối tiếp
+    chunk = rsa_block_size(n) * RSA_READ_BLOCKS
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        while True:
+            data = fin.read(chunk)
+            if not data:
+                break
+            fout.write(rsa_encrypt_bytes(data, e, n))
+
+def rsa_decrypt_file(src, dst, d, n, crt):
+    with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+        while True:
+            header = fin.read(BINARY_HEADER.size)
+            if not header:
+                break
+            if len(header) < BINARY_HEADER.size:
+                raise ValueError("Truncated ciphertext header")
+            fout.write(rsa_decrypt_bytes(header + fin.read(record_body_size(header, n)), d, n, crt))
+
+def process_file(task):
+    algorithm, action, src, dst, params = task
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    size = os.path.getsize(src)
+    try:
+        if algorithm == "playfair":
+            playfair_file(src, dst, action == "decrypt", params["key"], params["size"])
+        elif action == "encrypt":
+            rsa_encrypt_file(src, dst, params["e"], params["n"])
+        else:
+            rsa_decrypt_file(src, dst, params["d"], params["n"], params.get("crt"))
+    except Exception as ex:
+        # Không để lại file kết quả dở dang
+        if os.path.exists(dst):
+            os.remove(dst)
+        return src, size, f"{type(ex).__name__}: {ex}"
+    return src, size, None
+
+# ==== Khóa RSA ====
+def check_primes(p, q):
+    # Như nút GENERATE của rsa_gui: p, q phải là hai số nguyên tố khác nhau,
+    # nếu không bản mã sinh ra không giải mã lại được (hoặc CRT báo lỗi)
+    if not (is_probable_prime(p) and is_probable_prime(q)) or p == q:
+        raise SystemExit("P and Q must be two different prime numbers")
+
+def load_rsa_key(path):
+    with open(path) as f:
+        key = {k: int(v) for k, v in json.load(f).items()}
+    if "p" in key and "q" in key:
+        check_primes(key["p"], key["q"])
+        key["crt"] = crt_params(key["p"], key["q"], key["d"])
+    return key
+
+def save_rsa_key(path, p, q):
+    e, d, n, _ = generate_keys(p, q)
+    with open(path, 'w') as f:
+        json.dump({"e": str(e), "d": str(d), "n": str(n), "p": str(p), "q": str(q)}, f, indent=2)
+
+def rsa_params(args):
+    if args.key_file:
+        return load_rsa_key(args.key_file)
+    if args.p and args.q:
+        check_primes(args.p, args.q)
+        e, d, n, _ = generate_keys(args.p, args.q)
+        return {"e": e, "d": d, "n": n, "crt": crt_params(args.p, args.q, d)}
+    raise SystemExit("RSA needs --key-file or --p/--q")
+
+# ==== Chạy ====
+def run_batch(algorithm, action, src_root, dst_root, params, workers=None):
+    tasks = [(algorithm, action, src, output_path(src, src_root, dst_root, action == "decrypt"), params)
+             for src in walk_files(src_root)]
+    start = time.perf_counter()
+    if (workers or os.cpu_count() or 1) == 1:
+        results = [process_file(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(process_file, tasks))
+    elapsed = time.perf_counter() - start
+    return results, elapsed
+
+def report(results, elapsed):
+    failed = [(src, err) for src, _, err in results if err]
+    total_bytes = sum(size for _, size, _ in results)
+    for src, err in failed:
+        print(f"FAILED {src}: {err}", file=sys.stderr)
+    elapsed = max(elapsed, 1e-9)
+    print(f"{len(results) - len(failed)}/{len(results)} files, {total_bytes / 1e6:.2f} MB in {elapsed:.2f} s "
+          f"({len(results) / elapsed:.1f} files/s, {total_bytes / 1e6 / elapsed:.2f} MB/s)")
+    return 1 if failed else 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mã hóa/giải mã hàng loạt file bằng Playfair hoặc RSA")
+    sub = parser.add_subparsers(dest="algorithm", required=True)
+
+    pf = sub.add_parser("playfair")
+    pf.add_argument("action", choices=["encrypt", "decrypt"])
+    pf.add_argument("src")
+    pf.add_argument("dst")
+    pf.add_argument("--key", required=True)
+    pf.add_argument("--size", type=int, choices=[5, 6], default=5)
+    pf.add_argument("--workers", type=int)
+
+    rs = sub.add_parser("rsa")
+    rs.add_argument("action", choices=["encrypt", "decrypt", "keygen"])
+    rs.add_argument("src", nargs="?")
+    rs.add_argument("dst", nargs="?")
+    rs.add_argument("--key-file")
+    rs.add_argument("--p", type=int)
+    rs.add_argument("--q", type=int)
+    rs.add_argument("--bits", type=int, default=2048, help="độ dài khóa cho keygen")
+    rs.add_argument("--workers", type=int)
+
+    args = parser.parse_args(argv)
+    if args.algorithm == "playfair":
+        params = {"key": args.key, "size": args.size}
+    elif args.action == "keygen":
+        if not args.key_file:
+            raise SystemExit("keygen needs --key-file")
+        save_rsa_key(args.key_file, *generate_large_primes(args.bits))
+        print(f"Saved {args.bits}-bit key to {args.key_file}")
+        return 0
+    else:
+        params = rsa_params(args)
+    if not args.src or not args.dst:
+        raise SystemExit("src and dst directories are required")
+    return report(*run_batch(args.algorithm, args.action, args.src, args.dst, params, args.workers))
+
+if __name__ == "__main__":
+    sys.exit(main())
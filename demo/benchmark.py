@@ -0,0 +1,232 @@
+import argparse
+import csv
+import json
+import random
+import statistics
+import os
+import string
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from playfair_core import PlayfairCipher, create_matrix
+from rsa_core import CODEBOOK, crt_params, generate_keys, generate_large_primes, rsa_decrypt, rsa_encrypt
+
+# ==== Benchmark không cần GUI ====
+# Đo riêng sinh khóa / mã hóa / giải mã cho Playfair, RSA tự viết (rsa_gui)
+# và thư viện rsa, bằng perf_counter_ns có chạy khởi động (warm-up) trước.
+
+FIELDS = ["algorithm", "operation", "message_size", "key_size", "runs",
+          "median_ms", "p95_ms", "stddev_ms", "mean_ms"]
+
+def measure(fn, repeat, warmup, setup=None):
+    # setup (tùy chọn) chạy trước mỗi lần gọi, không tính vào thời gian (xóa cache, chờ pool rảnh...)
+    for _ in range(warmup):
+        if setup:
+            setup()
+        fn()
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter_ns()
+        fn()
+        samples.append(time.perf_counter_ns() - start)
+    return samples
+
+def summarize(samples):
+    ms = sorted(s / 1e6 for s in samples)
+    p95 = statistics.quantiles(ms, n=20, method="inclusive")[18] if len(ms) > 1 else ms[0]
+    return {
+        "runs": len(ms),
+        "median_ms": round(statistics.median(ms), 4),
+        "p95_ms": round(p95, 4),
+        "stddev_ms": round(statistics.stdev(ms), 4) if len(ms) > 1 else 0.0,
+        "mean_ms": round(statistics.fmean(ms), 4),
+    }
+
+def random_message(size, alphabet=string.ascii_letters):
+    return ''.join(random.choices(alphabet, k=size))
+
+def bench_playfair(sizes, repeat, warmup, key="KEYWORD"):
+    rows = []
+    stats = summarize(measure(lambda: PlayfairCipher(create_matrix(key, 5), 5), repeat, warmup))
+    rows.append(dict(algorithm="playfair", operation="keygen", message_size=0, key_size=5, **stats))
+    cipher = PlayfairCipher(create_matrix(key, 5), 5)
+    for size in sizes:
+        msg = random_message(size, "ABCDEFGHIKLMNOPQRSTUVWXYZ")
+        enc = cipher.encrypt(msg)
+        for op, fn in (("encrypt", lambda: cipher.encrypt(msg)), ("decrypt", lambda: cipher.decrypt(enc))):
+            stats = summarize(measure(fn, repeat, warmup))
+            rows.append(dict(algorithm="playfair", operation=op, message_size=size, key_size=5, **stats))
+    return rows
+
+# Dữ liệu nhiều chữ số (khoảng một nửa): 5x5 phải đổi mỗi chữ số thành từ tiếng Anh,
+# 6x6 mã hóa trực tiếp A-Z + 0-9
+NUMERIC_ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ" + "0123456789" * 3
+
+def compare_alphabets(size=65536, repeat=10, warmup=2, key="KEYWORD"):
+    msg = random_message(size, NUMERIC_ALPHABET)
+    rows = []
+    for n in (5, 6):
+        cipher = PlayfairCipher(create_matrix(key, n), n)
+        enc = cipher.encrypt(msg)
+        enc_ms = summarize(measure(lambda: cipher.encrypt(msg), repeat, warmup))["median_ms"]
+        dec_ms = summarize(measure(lambda: cipher.decrypt(enc), repeat, warmup))["median_ms"]
+        rows.append({"matrix": f"{n}x{n}", "input_chars": len(msg), "output_chars": len(enc),
+                     "encrypt_ms": enc_ms, "decrypt_ms": dec_ms,
+                     "encrypt_mb_s": round(len(msg) / 1e3 / enc_ms, 2)})
+    return rows
+
+def format_alphabets(rows):
+    lines = ["%-6s %10s %10s %7s %10s %10s %10s" % ("matrix", "input", "output", "ratio", "enc ms", "dec ms", "enc MB/s")]
+    for r in rows:
+        lines.append("%-6s %10d %10d %7.2f %10.3f %10.3f %10.2f" % (
+            r["matrix"], r["input_chars"], r["output_chars"], r["output_chars"] / r["input_chars"],
+            r["encrypt_ms"], r["decrypt_ms"], r["encrypt_mb_s"]))
+    return "\n".join(lines)
+
+def bench_keygen(bits, repeat, pool):
+    # Dùng chung một pool đã khởi động (một lần chạy warm-up), nên thời gian không gồm việc
+    # tạo tiến trình con; các lần tìm số nguyên tố còn dở của lần trước được chờ xong ngoài giờ đo
+    leftover = []
+
+    def drain():
+        wait(leftover)
+        leftover.clear()
+    return measure(lambda: generate_keys(*generate_large_primes(bits, pool=pool, leftover=leftover)),
+                   repeat, 1, drain)
+
+def bench_rsa_gui(sizes, key_sizes, repeat, warmup, keygen_repeat, modes=("char", "block")):
+    # Sinh khóa không phụ thuộc chế độ nên chỉ đo một lần cho mỗi độ dài khóa (hàng "rsa_gui"),
+    # các chế độ dùng chung khóa đó.
+    # Chế độ char dùng CODEBOOK (ghi nhớ kết quả pow): hàng "rsa_gui-char" xóa codebook trước mỗi lần đo
+    # (chi phí RSA thật), hàng "rsa_gui-char-cached" đo khi codebook đã có sẵn mọi ký tự
+    rows = []
+    with ProcessPoolExecutor() as pool:
+        for bits in key_sizes:
+            stats = summarize(bench_keygen(bits, keygen_repeat, pool))
+            rows.append(dict(algorithm="rsa_gui", operation="keygen", message_size=0, key_size=bits, **stats))
+            p, q = generate_large_primes(bits, pool=pool)
+            e, d, n, _ = generate_keys(p, q)
+            crt = crt_params(p, q, d)
+            for mode in modes:
+                name = f"rsa_gui-{mode}"
+                variants = [(name, CODEBOOK.clear), (f"{name}-cached", None)] if mode == "char" else [(name, None)]
+                for size in sizes:
+                    msg = random_message(size)
+                    enc = rsa_encrypt(msg, e, n, mode, "binary")
+                    ops = (("encrypt", lambda: rsa_encrypt(msg, e, n, mode, "binary")),
+                           ("decrypt", lambda: rsa_decrypt(enc, d, n, crt)))
+                    for variant, setup in variants:
+                        for op, fn in ops:
+                            stats = summarize(measure(fn, repeat, warmup, setup))
+                            rows.append(dict(algorithm=variant, operation=op, message_size=size, key_size=bits, **stats))
+    return rows
+
+def bench_rsa_lib(sizes, key_sizes, repeat, warmup, keygen_repeat):
+    try:
+        import rsa  # type: ignore
+    except ImportError:
+        return []
+    rows = []
+    for bits in key_sizes:
+        stats = summarize(measure(lambda: rsa.newkeys(bits), keygen_repeat, 0))
+        rows.append(dict(algorithm="rsa_lib", operation="keygen", message_size=0, key_size=bits, **stats))
+        pub, priv = rsa.newkeys(bits)
+        # PKCS#1 v1.5: mỗi khối tối đa k - 11 byte
+        chunk = bits // 8 - 11
+        for size in sizes:
+            data = random_message(size).encode()
+            parts = [data[i:i+chunk] for i in range(0, len(data), chunk)]
+            enc = [rsa.encrypt(part, pub) for part in parts]
+            ops = (("encrypt", lambda: [rsa.encrypt(part, pub) for part in parts]),
+                   ("decrypt", lambda: [rsa.decrypt(block, priv) for block in enc]))
+            for op, fn in ops:
+                stats = summarize(measure(fn, repeat, warmup))
+                rows.append(dict(algorithm="rsa_lib", operation=op, message_size=size, key_size=bits, **stats))
+    return rows
+
+def run_benchmarks(sizes=(16, 256, 4096), key_sizes=(1024,), repeat=20, warmup=3, keygen_repeat=3):
+    rows = bench_playfair(sizes, repeat, warmup)
+    rows += bench_rsa_gui(sizes, key_sizes, repeat, warmup, keygen_repeat)
+    rows += bench_rsa_lib(sizes, key_sizes, repeat, warmup, keygen_repeat)
+    return rows
+
+def save_results(rows, path):
+    if path.endswith(".csv"):
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+    else:
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+def load_results(path):
+    if path.endswith(".csv"):
+        with open(path, newline='') as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            for field in FIELDS[2:5]:
+                row[field] = int(row[field])
+            for field in FIELDS[5:]:
+                row[field] = float(row[field])
+        return rows
+    with open(path) as f:
+        return json.load(f)
+
+# Mục tiêu thời gian khởi động: import phần lõi (không Tk, không matplotlib) dưới 50 ms
+STARTUP_TARGET_MS = 50
+CORE_MODULES = ("playfair_core", "rsa_core")
+
+def measure_startup(modules=CORE_MODULES, runs=5):
+    # Mỗi lần đo trong một tiến trình Python mới để không dính cache import
+    code = ("import time; t = time.perf_counter_ns(); import %s; "
+            "print((time.perf_counter_ns() - t) / 1e6)" % ", ".join(modules))
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, "-c", code], cwd=here, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout))
+    return statistics.median(samples)
+
+def format_table(rows):
+    lines = ["%-19s %-8s %8s %6s %10s %10s %10s" % ("algorithm", "op", "msg", "key", "median", "p95", "stddev")]
+    for r in rows:
+        lines.append("%-19s %-8s %8d %6d %10.4f %10.4f %10.4f" % (
+            r["algorithm"], r["operation"], r["message_size"], r["key_size"],
+            r["median_ms"], r["p95_ms"], r["stddev_ms"]))
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Playfair và RSA (không cần GUI)")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[16, 256, 4096], help="kích thước thông điệp (ký tự)")
+    parser.add_argument("--key-sizes", type=int, nargs="+", default=[1024], help="độ dài khóa RSA (bit)")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--keygen-repeat", type=int, default=3)
+    parser.add_argument("-o", "--output", help="file kết quả .json hoặc .csv")
+    parser.add_argument("--startup", action="store_true", help="chỉ đo thời gian import phần lõi")
+    parser.add_argument("--alphabets", action="store_true", help="so sánh Playfair 5x5 (đổi số thành chữ) và 6x6 trên dữ liệu nhiều chữ số")
+    args = parser.parse_args(argv)
+
+    if args.alphabets:
+        print(format_alphabets(compare_alphabets(max(args.sizes), args.repeat, args.warmup)))
+        return 0
+
+    if args.startup:
+        ms = measure_startup()
+        status = "OK" if ms <= STARTUP_TARGET_MS else "SLOW"
+        print(f"Core import ({', '.join(CORE_MODULES)}): {ms:.1f} ms (target {STARTUP_TARGET_MS} ms) {status}")
+        return 0 if status == "OK" else 1
+
+    rows = run_benchmarks(args.sizes, args.key_sizes, args.repeat, args.warmup, args.keygen_repeat)
+    print(format_table(rows))
+    if args.output:
+        save_results(rows, args.output)
+        print(f"Saved {len(rows)} rows to {args.output}")
+
+if __name__ == "__main__":
+    sys.exit(main())
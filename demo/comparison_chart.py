@@ -0,0 +1,70 @@
+from collections import deque
+
+# ==== Biểu đồ so sánh dùng lại được ====
+# Một Figure + một canvas duy nhất cho cả cửa sổ: mỗi lần so sánh chỉ cập nhật chiều cao
+# cột / dữ liệu đường rồi draw_idle(). Figure tạo trực tiếp (không qua pyplot) nên không bị
+# pyplot giữ lại; lịch sử các lần chạy nằm trong deque có giới hạn nên bộ nhớ không tăng dần.
+
+HISTORY_SIZE = 50
+
+class ComparisonChart:
+    def __init__(self, master, history=HISTORY_SIZE):
+        # matplotlib chỉ được import khi cửa sổ so sánh thực sự mở
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+
+        self.history = deque(maxlen=history)
+        self.fig = Figure(figsize=(8, 3))
+        self.bar_ax, self.trend_ax = self.fig.subplots(1, 2)
+        self.bar_ax.set_ylabel("Thời gian (ms)")
+        self.bars = None
+        self.bar_texts = []
+        self.labels = None
+
+        self.trend_ax.set_title(f"Các lần chạy gần nhất (tối đa {history})")
+        self.trend_ax.set_xlabel("Lần chạy")
+        self.pf_line, = self.trend_ax.plot([], [], color="orange", marker=".", label="Playfair")
+        self.rsa_line, = self.trend_ax.plot([], [], color="skyblue", marker=".", label="RSA")
+        self.trend_ax.legend(loc="upper left")
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=master)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True)
+
+    def show_bars(self, labels, values, colors, title):
+        labels = list(labels)
+        if labels != self.labels:
+            # Nhãn khác lần trước (ví dụ mở file benchmark): dựng lại cột trên cùng trục
+            if self.bars is not None:
+                self.bars.remove()
+            for text in self.bar_texts:
+                text.remove()
+            xs = range(len(labels))
+            self.bars = self.bar_ax.bar(xs, values, color=colors)
+            self.bar_texts = self.bar_ax.bar_label(self.bars, fmt='%.2f ms')
+            self.bar_ax.set_xticks(xs, labels)
+            self.bar_ax.set_xlim(-0.5, len(labels) - 0.5)
+            self.labels = labels
+        else:
+            for rect, text, value in zip(self.bars, self.bar_texts, values):
+                rect.set_height(value)
+                text.set_text('%.2f ms' % value)
+                text.xy = (rect.get_x() + rect.get_width() / 2, value)
+        self.bar_ax.set_title(title)
+        self.bar_ax.relim()
+        self.bar_ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def add_run(self, pf_time, rsa_time):
+        self.history.append((pf_time, rsa_time))
+        xs = range(1, len(self.history) + 1)
+        self.pf_line.set_data(xs, [h[0] for h in self.history])
+        self.rsa_line.set_data(xs, [h[1] for h in self.history])
+        self.trend_ax.relim()
+        self.trend_ax.autoscale_view()
+        self.canvas.draw_idle()
+
+    def clear_history(self):
+        self.history.clear()
+        self.pf_line.set_data([], [])
+        self.rsa_line.set_data([], [])
+        self.canvas.draw_idle()
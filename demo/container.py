@@ -0,0 +1,216 @@
+import argparse
+import mmap
+import os
+import struct
+import sys
+from bisect import bisect_right
+
+from playfair_core import get_cipher
+from rsa_core import rsa_decrypt_bytes, rsa_encrypt_bytes
+
+# ==== Container mã hóa theo khối, có chỉ mục ====
+# File = header + các khối mã hóa độc lập + bảng chỉ mục + footer (ở cuối file).
+# Mỗi mục chỉ mục: (vị trí khối mã, độ dài khối mã, vị trí trong bản giải mã, độ dài bản giải mã),
+# nên đọc bằng mmap có thể giải mã riêng N khối đầu hoặc một khoảng byte bất kỳ
+# mà không phải đọc/giải mã phần còn lại.
+#   python container.py pack playfair SRC DST --key KEYWORD
+#   python container.py read DST --key KEYWORD --range 1000000 200
+#   python container.py pack rsa SRC DST --key-file key.json
+
+CONTAINER_MAGIC = b"ENCX"
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = struct.Struct(">4sBBBxI")  # magic, version, thuật toán, kích thước Playfair, độ dài khối rõ
+INDEX_ENTRY = struct.Struct(">QIQI")
+CONTAINER_FOOTER = struct.Struct(">QI4s")  # vị trí bảng chỉ mục, số khối, magic
+FOOTER_MAGIC = b"XIDX"
+ALGORITHMS = {"playfair": 0, "rsa": 1}
+CONTAINER_BLOCK_SIZE = 64 * 1024
+
+# ==== Ghi ====
+def write_container(src, dst, algorithm, encrypt_block, block_size=CONTAINER_BLOCK_SIZE, size=0):
+    # encrypt_block(bytes) -> (khối mã bytes, độ dài bản giải mã của khối)
+    index = []
+    out_offset = 0
+    try:
+        with open(src, 'rb') as fin, open(dst, 'wb') as fout:
+            fout.write(CONTAINER_HEADER.pack(CONTAINER_MAGIC, CONTAINER_VERSION, ALGORITHMS[algorithm], size, block_size))
+            while True:
+                data = fin.read(block_size)
+                if not data:
+                    break
+                block, out_length = encrypt_block(data)
+                index.append(INDEX_ENTRY.pack(fout.tell(), len(block), out_offset, out_length))
+                fout.write(block)
+                out_offset += out_length
+            index_offset = fout.tell()
+            fout.write(b''.join(index))
+            fout.write(CONTAINER_FOOTER.pack(index_offset, len(index), FOOTER_MAGIC))
+    except BaseException:
+        # Container thiếu chỉ mục không đọc được, không để lại file dở dang
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+    return len(index)
+
+def playfair_encrypt_container(src, dst, key, size=5, block_size=CONTAINER_BLOCK_SIZE):
+    # Mỗi khối được chuẩn hóa (bỏ xuống dòng, dấu câu... như normalize_chunk), ghép cặp và mã hóa
+    # riêng; bản giải mã dài đúng bằng bản mã, khối chỉ có ký tự bị bỏ thành khối rỗng
+    cipher = get_cipher(key, size)
+
+    def encrypt_block(data):
+        enc = cipher.encrypt(data.decode('latin-1')).encode('ascii')
+        return enc, len(enc)
+    return write_container(src, dst, "playfair", encrypt_block, block_size, size)
+
+def rsa_encrypt_container(src, dst, e, n, block_size=CONTAINER_BLOCK_SIZE):
+    # Mỗi khối là một bản mã nhị phân RSAB tự mang độ dài gốc
+    return write_container(src, dst, "rsa", lambda data: (rsa_encrypt_bytes(data, e, n), len(data)), block_size)
+
+# ==== Đọc ====
+class ContainerReader:
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise ValueError("Empty container")
+        try:
+            self._read_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _read_index(self):
+        if len(self.map) < CONTAINER_HEADER.size + CONTAINER_FOOTER.size:
+            raise ValueError("Truncated container")
+        magic, version, algorithm, size, block_size = CONTAINER_HEADER.unpack_from(self.map)
+        if magic != CONTAINER_MAGIC:
+            raise ValueError("Not an encrypted container")
+        if version != CONTAINER_VERSION:
+            raise ValueError(f"Unsupported container version {version}")
+        index_offset, count, footer_magic = CONTAINER_FOOTER.unpack_from(self.map, len(self.map) - CONTAINER_FOOTER.size)
+        if footer_magic != FOOTER_MAGIC or index_offset + count * INDEX_ENTRY.size != len(self.map) - CONTAINER_FOOTER.size:
+            raise ValueError("Container index is missing or truncated")
+        self.algorithm = {code: name for name, code in ALGORITHMS.items()}[algorithm]
+        self.size = size
+        self.block_size = block_size
+        self.index = list(INDEX_ENTRY.iter_unpack(self.map[index_offset:index_offset + count * INDEX_ENTRY.size]))
+        # Vị trí bắt đầu trong bản giải mã của từng khối, để tìm khối bằng bisect
+        self.starts = [entry[2] for entry in self.index]
+        self.total_length = self.index[-1][2] + self.index[-1][3] if self.index else 0
+
+    def __len__(self):
+        return len(self.index)
+
+    def block(self, i):
+        # Chỉ lấy lát cắt của mmap: hệ điều hành chỉ nạp các trang thật sự được đọc
+        offset, length, _, _ = self.index[i]
+        return self.map[offset:offset + length]
+
+    def close(self):
+        if getattr(self, "map", None) is not None:
+            self.map.close()
+            self.map = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def playfair_block_decryptor(key, size=5):
+    cipher = get_cipher(key, size)
+    return lambda block: cipher.decrypt(block.decode('ascii')).encode('ascii')
+
+def rsa_block_decryptor(d, n, crt=None):
+    return lambda block: rsa_decrypt_bytes(block, d, n, crt)
+
+def decrypt_blocks(reader, decrypt_block, start=0, count=None):
+    stop = len(reader) if count is None else min(len(reader), start + count)
+    return b''.join([decrypt_block(reader.block(i)) for i in range(start, stop)])
+
+def decrypt_range(reader, decrypt_block, offset, length):
+    # Khoảng [offset, offset + length) của bản giải mã: chỉ giải mã các khối chứa khoảng đó
+    if offset < 0 or length < 0:
+        raise ValueError("Offset and length must be non-negative")
+    end = min(offset + length, reader.total_length)
+    if offset >= end:
+        return b''
+    first = bisect_right(reader.starts, offset) - 1
+    last = bisect_right(reader.starts, end - 1)
+    data = decrypt_blocks(reader, decrypt_block, first, last - first)
+    skip = offset - reader.starts[first]
+    return data[skip:skip + end - offset]
+
+# ==== Dòng lệnh ====
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Container mã hóa theo khối, đọc ngẫu nhiên bằng mmap")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    pack = sub.add_parser("pack")
+    pack.add_argument("algorithm", choices=list(ALGORITHMS))
+    pack.add_argument("src")
+    pack.add_argument("dst")
+    pack.add_argument("--block-size", type=int, default=CONTAINER_BLOCK_SIZE)
+    pack.add_argument("--size", type=int, choices=[5, 6], default=5)
+
+    read = sub.add_parser("read")
+    read.add_argument("src")
+    read.add_argument("-o", "--output", help="ghi ra file thay vì stdout")
+    what = read.add_mutually_exclusive_group()
+    what.add_argument("--blocks", type=int, help="chỉ giải mã N khối đầu")
+    what.add_argument("--range", type=int, nargs=2, metavar=("OFFSET", "LENGTH"))
+
+    info = sub.add_parser("info")
+    info.add_argument("src")
+
+    for p in (pack, read):
+        p.add_argument("--key", help="khóa Playfair")
+        p.add_argument("--key-file", help="khóa RSA (JSON, như batch_cli.py)")
+    args = parser.parse_args(argv)
+
+    if args.command == "info":
+        with ContainerReader(args.src) as reader:
+            print(f"{reader.algorithm}: {len(reader)} blocks of {reader.block_size} bytes, "
+                  f"{reader.total_length} bytes decrypted, {os.path.getsize(args.src)} bytes on disk")
+        return 0
+
+    from batch_cli import load_rsa_key
+    if args.command == "pack":
+        if args.algorithm == "playfair":
+            if not args.key:
+                raise SystemExit("Playfair needs --key")
+            count = playfair_encrypt_container(args.src, args.dst, args.key, args.size, args.block_size)
+        else:
+            if not args.key_file:
+                raise SystemExit("RSA needs --key-file")
+            key = load_rsa_key(args.key_file)
+            count = rsa_encrypt_container(args.src, args.dst, key["e"], key["n"], args.block_size)
+        print(f"Wrote {count} blocks to {args.dst}")
+        return 0
+
+    with ContainerReader(args.src) as reader:
+        if reader.algorithm == "playfair":
+            if not args.key:
+                raise SystemExit("Playfair needs --key")
+            decrypt_block = playfair_block_decryptor(args.key, reader.size)
+        else:
+            if not args.key_file:
+                raise SystemExit("RSA needs --key-file")
+            key = load_rsa_key(args.key_file)
+            decrypt_block = rsa_block_decryptor(key["d"], key["n"], key.get("crt"))
+        if args.range:
+            data = decrypt_range(reader, decrypt_block, *args.range)
+        else:
+            data = decrypt_blocks(reader, decrypt_block, 0, args.blocks)
+    if args.output:
+        with open(args.output, 'wb') as f:
+            f.write(data)
+    else:
+        sys.stdout.buffer.write(data)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
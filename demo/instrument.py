@@ -0,0 +1,150 @@
+import json
+import math
+import threading
+import time
+from collections import deque
+from functools import wraps
+
+# ==== Đo đạc các đoạn nóng (bật/tắt lúc chạy) ====
+# Các hàm lõi được bọc bởi @timed(stage): khi tắt, chi phí chỉ là một lần gọi hàm thêm và một
+# phép kiểm tra cờ. Khi bật, mỗi lần gọi ghi số lần gọi, số phần tử (cặp chữ, lần pow...),
+# số byte và thời gian. Thời gian là thời gian riêng (self): phần của các hàm con cũng được đo
+# sẽ bị trừ ra, nên cộng các stage lại không bị tính trùng.
+# Stage: normalize, digraph, modexp, encode, render.
+# Chế độ cProfile: mỗi lần gọi ngoài cùng được chạy dưới một cProfile.Profile dùng chung
+# (mỗi lúc chỉ một luồng được profile).
+
+STAGES = ("normalize", "digraph", "modexp", "encode", "render")
+SAMPLE_SIZE = 2048  # số mẫu thời gian gần nhất giữ lại cho mỗi stage để tính phân vị
+
+_state = {"enabled": False, "profile": None}
+_lock = threading.Lock()
+_profile_lock = threading.Lock()
+_local = threading.local()
+STATS = {}
+COUNTERS = {}
+
+class StageStats:
+    def __init__(self):
+        self.calls = 0
+        self.items = 0
+        self.bytes = 0
+        self.total_ns = 0
+        self.samples = deque(maxlen=SAMPLE_SIZE)
+
+    def summary(self):
+        ms = sorted(s / 1e6 for s in self.samples)
+
+        def pct(p):
+            # Nearest-rank
+            return round(ms[max(0, math.ceil(p * len(ms)) - 1)], 4) if ms else 0.0
+        total_ms = self.total_ns / 1e6
+        return {
+            "calls": self.calls,
+            "items": self.items,
+            "bytes": self.bytes,
+            "total_ms": round(total_ms, 3),
+            "mean_ms": round(total_ms / self.calls, 4) if self.calls else 0.0,
+            "p50_ms": pct(0.50),
+            "p95_ms": pct(0.95),
+            "p99_ms": pct(0.99),
+            "mb_per_s": round(self.bytes / 1e3 / total_ms, 2) if total_ms else 0.0,
+        }
+
+def enable(on=True):
+    _state["enabled"] = on
+
+def is_enabled():
+    return _state["enabled"]
+
+def record(stage, ns, items=1, nbytes=0):
+    with _lock:
+        st = STATS.get(stage)
+        if st is None:
+            st = STATS[stage] = StageStats()
+        st.calls += 1
+        st.items += items
+        st.bytes += nbytes
+        st.total_ns += ns
+        st.samples.append(ns)
+
+def count(name, n=1):
+    # Bộ đếm đơn giản (số lần tra bảng cặp chữ Playfair, số lần pow...), chỉ đếm khi đang bật
+    if _state["enabled"]:
+        with _lock:
+            COUNTERS[name] = COUNTERS.get(name, 0) + n
+
+def timed(stage, measure=None):
+    # measure(args, result) -> (items, bytes); mặc định 1 phần tử, 0 byte
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _state["enabled"]:
+                return fn(*args, **kwargs)
+            stack = getattr(_local, "stack", None)
+            if stack is None:
+                stack = _local.stack = []
+            outer = not stack
+            stack.append(0)
+            profiler = _state["profile"]
+            profiling = outer and profiler is not None and _profile_lock.acquire(blocking=False)
+            start = time.perf_counter_ns()
+            try:
+                if profiling:
+                    result = profiler.runcall(fn, *args, **kwargs)
+                else:
+                    result = fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter_ns() - start
+                if profiling:
+                    _profile_lock.release()
+                children = stack.pop()
+                if stack:
+                    stack[-1] += elapsed
+            items, nbytes = measure(args, result) if measure else (1, 0)
+            record(stage, elapsed - children, items, nbytes)
+            return result
+        return wrapper
+    return decorator
+
+# ==== cProfile ====
+def profile_start():
+    import cProfile
+    _state["profile"] = cProfile.Profile()
+
+def profile_stop(limit=30, sort="cumulative"):
+    # Trả về bảng pstats dạng chữ (None nếu chưa bật)
+    profiler, _state["profile"] = _state["profile"], None
+    if profiler is None:
+        return None
+    import io
+    import pstats
+    with _profile_lock:
+        out = io.StringIO()
+        try:
+            pstats.Stats(profiler, stream=out).sort_stats(sort).print_stats(limit)
+        except TypeError:
+            # Chưa có lần gọi nào được profile
+            return ""
+    return out.getvalue()
+
+def is_profiling():
+    return _state["profile"] is not None
+
+# ==== Kết quả ====
+def snapshot():
+    with _lock:
+        stages = {name: STATS[name].summary() for name in STATS}
+        counters = dict(COUNTERS)
+    ordered = {name: stages[name] for name in STAGES if name in stages}
+    ordered.update({name: s for name, s in stages.items() if name not in ordered})
+    return {"enabled": _state["enabled"], "stages": ordered, "counters": counters}
+
+def reset():
+    with _lock:
+        STATS.clear()
+        COUNTERS.clear()
+
+def export_json(path):
+    with open(path, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
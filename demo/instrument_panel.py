@@ -0,0 +1,78 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox, scrolledtext, ttk
+
+import instrument
+
+# ==== Bảng số liệu đo đạc trong cửa sổ chính ====
+# Bật/tắt đo và cProfile lúc đang chạy, xem số liệu từng stage (tự làm mới mỗi giây), xuất JSON.
+
+REFRESH_MS = 1000
+COLUMNS = (("calls", "Số lần", 60), ("items", "Phần tử", 70), ("bytes", "Byte", 80),
+           ("total_ms", "Tổng ms", 70), ("p50_ms", "p50 ms", 65), ("p95_ms", "p95 ms", 65),
+           ("p99_ms", "p99 ms", 65), ("mb_per_s", "MB/s", 60))
+
+def build_instrument_panel(parent):
+    panel = tk.LabelFrame(parent, text="Đo hiệu năng", bg="white")
+
+    enabled_var = tk.IntVar(value=int(instrument.is_enabled()))
+    profile_var = tk.IntVar(value=int(instrument.is_profiling()))
+
+    def toggle_enabled():
+        instrument.enable(bool(enabled_var.get()))
+        refresh(reschedule=False)
+
+    def toggle_profile():
+        if profile_var.get():
+            # Profile chỉ ghi khi đang bật đo
+            enabled_var.set(1)
+            toggle_enabled()
+            instrument.profile_start()
+        else:
+            show_profile(instrument.profile_stop())
+
+    def show_profile(report):
+        win = tk.Toplevel(panel)
+        win.title("cProfile")
+        box = scrolledtext.ScrolledText(win, width=110, height=30, font=("Courier", 9))
+        box.pack(fill=tk.BOTH, expand=True)
+        box.insert(tk.END, report or "Chưa có lời gọi nào được profile.")
+
+    def reset():
+        instrument.reset()
+        refresh(reschedule=False)
+
+    def export():
+        path = filedialog.asksaveasfilename(defaultextension=".json", filetypes=[("JSON", "*.json")])
+        if path:
+            instrument.export_json(path)
+            messagebox.showinfo("Done", f"Đã lưu số liệu vào {path}")
+
+    controls = tk.Frame(panel, bg="white")
+    controls.pack(fill=tk.X)
+    tk.Checkbutton(controls, text="Bật đo", variable=enabled_var, command=toggle_enabled, bg="white").pack(side=tk.LEFT)
+    tk.Checkbutton(controls, text="cProfile", variable=profile_var, command=toggle_profile, bg="white").pack(side=tk.LEFT)
+    tk.Button(controls, text="Xóa số liệu", command=reset).pack(side=tk.LEFT, padx=5)
+    tk.Button(controls, text="Xuất JSON", command=export).pack(side=tk.LEFT, padx=5)
+
+    table = ttk.Treeview(panel, columns=[c[0] for c in COLUMNS], height=5)
+    table.heading("#0", text="Stage")
+    table.column("#0", width=90)
+    for key, title, width in COLUMNS:
+        table.heading(key, text=title)
+        table.column(key, width=width, anchor=tk.E)
+    table.pack(fill=tk.X)
+    counters_label = tk.Label(panel, text="", bg="white", anchor=tk.W)
+    counters_label.pack(fill=tk.X)
+
+    def refresh(reschedule=True):
+        snap = instrument.snapshot()
+        table.delete(*table.get_children())
+        for stage, row in snap["stages"].items():
+            table.insert("", tk.END, text=stage, values=[row[key] for key, _, _ in COLUMNS])
+        counters = ", ".join(f"{name}: {value}" for name, value in sorted(snap["counters"].items()))
+        counters_label.config(text=f"Bộ đếm: {counters or '-'}")
+        if reschedule:
+            panel.after(REFRESH_MS, refresh)
+
+    refresh()
+    return panel
@@ -0,0 +1,166 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# ==== Kho cặp khóa RSA sinh sẵn ====
+# Mỗi độ dài khóa có một kho riêng. Khi số khóa còn lại xuống dưới mức thấp (low_water),
+# một tiến trình phụ sinh thêm cho đủ target; lấy khóa từ kho gần như tức thời (hit),
+# kho rỗng thì phải sinh ngay tại chỗ (miss). Kho có thể lưu ra file JSON để dùng lại lần sau.
+# Khóa ở đây là khóa của thư viện rsa (dùng trong cửa sổ so sánh).
+
+POOL_TARGET = 4
+POOL_LOW_WATER = 2
+
+def new_keypair(bits):
+    # Chạy trong tiến trình con; trả về số nguyên để dễ pickle/lưu JSON
+    import rsa  # type: ignore
+    _, priv = rsa.newkeys(bits)
+    return priv.n, priv.e, priv.d, priv.p, priv.q
+
+def timed_keypair(bits):
+    # Như new_keypair nhưng đo luôn thời gian sinh trong tiến trình con (không gồm thời gian chờ hàng đợi)
+    start = time.perf_counter_ns()
+    fields = new_keypair(bits)
+    return fields, (time.perf_counter_ns() - start) / 1e6
+
+def to_rsa_keys(fields):
+    import rsa  # type: ignore
+    n, e, d, p, q = fields
+    return rsa.PublicKey(n, e), rsa.PrivateKey(n, e, d, p, q)
+
+class RSAKeyPool:
+    def __init__(self, bits, target=POOL_TARGET, low_water=POOL_LOW_WATER, path=None):
+        self.bits = bits
+        self.target = target
+        self.low_water = low_water
+        self.path = path
+        self.keys = deque()
+        self.lock = threading.Lock()
+        self.pending = 0
+        self.executor = None
+        self.hits = 0
+        self.misses = 0
+        self.refills = 0
+        self.refill_ms = []  # thời gian sinh mỗi khóa trong tiến trình phụ (ms), giữ 100 mẫu gần nhất
+        self.miss_ms = []
+        if path:
+            self.load()
+
+    def get(self):
+        # Trả về (PublicKey, PrivateKey) của thư viện rsa
+        with self.lock:
+            fields = self.keys.popleft() if self.keys else None
+            if fields:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fields is None:
+            start = time.perf_counter_ns()
+            fields = new_keypair(self.bits)
+            self._record(self.miss_ms, (time.perf_counter_ns() - start) / 1e6)
+        self.refill()
+        return to_rsa_keys(fields)
+
+    def refill(self):
+        # Gửi thêm việc cho tiến trình phụ nếu kho (tính cả khóa đang sinh) dưới mức thấp
+        with self.lock:
+            if len(self.keys) + self.pending >= self.low_water:
+                return
+            count = self.target - len(self.keys) - self.pending
+            self.pending += count
+            if self.executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self.executor = ProcessPoolExecutor(max_workers=1)
+            executor = self.executor
+        for _ in range(count):
+            executor.submit(timed_keypair, self.bits).add_done_callback(self._refilled)
+
+    def _refilled(self, future):
+        with self.lock:
+            self.pending -= 1
+            if future.cancelled() or future.exception() is not None:
+                return
+            fields, ms = future.result()
+            self.keys.append(fields)
+            self.refills += 1
+        self._record(self.refill_ms, ms)
+
+    def _record(self, samples, ms):
+        with self.lock:
+            samples.append(ms)
+            del samples[:-100]
+
+    def stats(self):
+        with self.lock:
+            refill = sorted(self.refill_ms)
+            return {
+                "bits": self.bits,
+                "available": len(self.keys),
+                "pending": self.pending,
+                "hits": self.hits,
+                "misses": self.misses,
+                "refills": self.refills,
+                "refill_ms_median": refill[len(refill) // 2] if refill else None,
+                "refill_ms_max": refill[-1] if refill else None,
+                "miss_ms_last": self.miss_ms[-1] if self.miss_ms else None,
+            }
+
+    # ==== Lưu / nạp kho ====
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path) as f:
+                stored = json.load(f).get(str(self.bits), [])
+        except (OSError, ValueError):
+            return
+        with self.lock:
+            self.keys.extend(tuple(int(v) for v in fields) for fields in stored)
+
+    def save(self):
+        if not self.path:
+            return
+        data = {}
+        if os.path.exists(self.path):
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        with self.lock:
+            data[str(self.bits)] = [[str(v) for v in fields] for fields in self.keys]
+        # File chứa khóa bí mật: tạo với quyền 0o600 (chỉ chủ sở hữu) rồi thay thế file cũ,
+        # nên file đã có từ trước với quyền rộng hơn cũng được thay bằng file 0o600
+        tmp = self.path + ".tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self.path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def close(self):
+        # Lưu phần còn lại rồi dừng tiến trình phụ (không chờ khóa đang sinh dở)
+        self.save()
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+POOLS = {}
+
+def get_pool(bits, path=None, **kwargs):
+    # Một kho cho mỗi độ dài khóa, dùng chung trong cả tiến trình
+    if bits not in POOLS:
+        POOLS[bits] = RSAKeyPool(bits, path=path, **kwargs)
+    return POOLS[bits]
+
+def close_pools():
+    for pool in POOLS.values():
+        pool.close()
+    POOLS.clear()
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import random
+import string
+import sys
+import time
+
+from rsa_core import generate_keys, generate_large_primes, rsa_encrypt
+from service import DEFAULT_HOST, DEFAULT_PORT, ServiceClient
+
+# ==== Tạo tải cho service.py ====
+# Mở nhiều kết nối, mỗi kết nối đặt khóa một lần rồi gửi yêu cầu với `pipeline` yêu cầu
+# đang chờ cùng lúc; báo số yêu cầu/giây và phân vị độ trễ.
+#   python loadgen.py --op playfair_encrypt --connections 16 --requests 20000
+#   python loadgen.py --op rsa_decrypt --bits 1024 --connections 32 --requests 2000
+
+OPS = ("playfair_encrypt", "playfair_decrypt", "rsa_encrypt", "rsa_decrypt")
+
+def percentiles(samples_ns, points=(50, 95, 99)):
+    ms = sorted(s / 1e6 for s in samples_ns)
+    if not ms:
+        return {}
+    result = {f"p{p}_ms": round(ms[max(0, -(-p * len(ms) // 100) - 1)], 3) for p in points}
+    result["max_ms"] = round(ms[-1], 3)
+    return result
+
+def make_payloads(args):
+    # Chuẩn bị sẵn dữ liệu (và khóa) để phía tạo tải không tốn CPU trong lúc đo
+    text = ''.join(random.choices(string.ascii_uppercase, k=args.size))
+    if args.op.startswith("playfair"):
+        key = {"op": "playfair_key", "key": args.key, "size": 5}
+        if args.op == "playfair_encrypt":
+            return key, "text", [text]
+        from playfair_core import get_cipher
+        return key, "text", [get_cipher(args.key).encrypt(text)]
+    p, q = generate_large_primes(args.bits)
+    key = {"op": "rsa_key", "p": str(p), "q": str(q)}
+    if args.op == "rsa_encrypt":
+        return key, "text", [text]
+    e, _, n, _ = generate_keys(p, q)
+    # Vài bản mã khác nhau để không chỉ đo một giá trị lặp lại
+    return key, "cipher", [rsa_encrypt(text[i:] + text[:i], e, n, "block", "binary") for i in range(8)]
+
+async def run_connection(args, key_request, field, payloads, counter, latencies, errors):
+    client = await ServiceClient.connect(args.host, args.port, args.unix)
+    try:
+        await client.call(**key_request)
+
+        async def worker():
+            while counter[0] < args.requests:
+                counter[0] += 1
+                payload = payloads[counter[0] % len(payloads)]
+                start = time.perf_counter_ns()
+                try:
+                    await client.call(args.op, **{field: payload})
+                except ValueError:
+                    errors[0] += 1
+                latencies.append(time.perf_counter_ns() - start)
+        await asyncio.gather(*[worker() for _ in range(args.pipeline)])
+    finally:
+        await client.close()
+
+async def run(args):
+    key_request, field, payloads = make_payloads(args)
+    client = await ServiceClient.connect(args.host, args.port, args.unix)
+    before = await client.call("stats")
+    counter, errors, latencies = [0], [0], []
+    start = time.perf_counter()
+    await asyncio.gather(*[run_connection(args, key_request, field, payloads, counter, latencies, errors)
+                           for _ in range(args.connections)])
+    elapsed = time.perf_counter() - start
+    after = await client.call("stats")
+    await client.close()
+    # Số liệu gom lô chỉ tính cho lần chạy này
+    batches = after["rsa_batches"] - before["rsa_batches"]
+    items = after["rsa_items"] - before["rsa_items"]
+    stats = {"rsa_batches": batches, "rsa_items": items, "mean_batch": round(items / batches, 2) if batches else 0.0}
+    return {"op": args.op, "requests": len(latencies), "errors": errors[0], "seconds": round(elapsed, 3),
+            "requests_per_second": round(len(latencies) / elapsed, 1), **percentiles(latencies), "service": stats}
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tạo tải và đo thông lượng/độ trễ của service.py")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix")
+    parser.add_argument("--op", choices=OPS, default="playfair_encrypt")
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--pipeline", type=int, default=4, help="số yêu cầu chờ đồng thời trên mỗi kết nối")
+    parser.add_argument("--requests", type=int, default=5000, help="tổng số yêu cầu")
+    parser.add_argument("--size", type=int, default=64, help="độ dài thông điệp (ký tự)")
+    parser.add_argument("--key", default="KEYWORD", help="khóa Playfair")
+    parser.add_argument("--bits", type=int, default=1024, help="độ dài khóa RSA")
+    args = parser.parse_args(argv)
+
+    r = asyncio.run(run(args))
+    print(f"{r['op']}: {r['requests']} requests ({r['errors']} errors) in {r['seconds']} s "
+          f"-> {r['requests_per_second']} req/s")
+    print(f"latency p50 {r.get('p50_ms')} ms, p95 {r.get('p95_ms')} ms, p99 {r.get('p99_ms')} ms, max {r.get('max_ms')} ms")
+    s = r["service"]
+    if s["rsa_batches"]:
+        print(f"service: {s['rsa_items']} RSA items in {s['rsa_batches']} batches (mean {s['mean_batch']})")
+    return 1 if r["errors"] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
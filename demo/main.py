@@ -1,83 +1,22 @@
 import tkinter as tk
-from tkinter import messagebox, filedialog
-import rsa  # type: ignore
+from tkinter import messagebox, filedialog, ttk
 import base64
+import os
 import time
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from fpdf import FPDF
 
+# matplotlib, fpdf và rsa chỉ được import khi cửa sổ so sánh / xuất PDF thực sự dùng tới
+from playfair_core import get_cipher
 from playfair_gui import open_playfair_window
 from rsa_gui import open_rsa_window
+from benchmark import load_results, format_table
+from background import BackgroundRunner
+from instrument_panel import build_instrument_panel
+from result_view import PagedText
+from keypool import close_pools, get_pool
 
-# ============================
-# PlayFair Helper
-# ============================
-def number_to_text(num_str):
-    num_dict = {"0": "ZERO", "1": "ONE", "2": "TWO", "3": "THREE", "4": "FOUR",
-                "5": "FIVE", "6": "SIX", "7": "SEVEN", "8": "EIGHT", "9": "NINE"}
-    return "".join(num_dict[digit] for digit in num_str)
-
-def prepare_text_for_playfair(text):
-    text = text.upper().replace('J', 'I').replace(" ", "")
-    result = ""
-    i = 0
-    while i < len(text):
-        char = text[i]
-        if char.isdigit():
-            num = ""
-            while i < len(text) and text[i].isdigit():
-                num += text[i]
-                i += 1
-            result += number_to_text(num)
-        else:
-            result += char
-            i += 1
-    return result
-
-def generate_matrix(key):
-    key = key.upper().replace('J', 'I')
-    result = []
-    for c in key:
-        if c not in result and c.isalpha():
-            result.append(c)
-    for c in "ABCDEFGHIKLMNOPQRSTUVWXYZ":
-        if c not in result:
-            result.append(c)
-    return [result[i:i+5] for i in range(0, 25, 5)]
-
-def find_position(matrix, letter):
-    for i, row in enumerate(matrix):
-        for j, char in enumerate(row):
-            if char == letter:
-                return i, j
-    return None
-
-def playfair_encrypt(text, matrix):
-    text = prepare_text_for_playfair(text)
-    i = 0
-    result = []
-    while i < len(text):
-        a = text[i]
-        b = text[i+1] if i+1 < len(text) else 'X'
-        if a == b:
-            b = 'X'
-            i += 1
-        else:
-            i += 2
-        row1, col1 = find_position(matrix, a)
-        row2, col2 = find_position(matrix, b)
-
-        if row1 == row2:
-            result.append(matrix[row1][(col1+1)%5])
-            result.append(matrix[row2][(col2+1)%5])
-        elif col1 == col2:
-            result.append(matrix[(row1+1)%5][col1])
-            result.append(matrix[(row2+1)%5][col2])
-        else:
-            result.append(matrix[row1][col2])
-            result.append(matrix[row2][col1])
-    return ''.join(result)
+# Khóa RSA cho cửa sổ so sánh lấy từ kho sinh sẵn, lưu lại giữa các lần chạy chương trình
+COMPARISON_KEY_BITS = 512
+KEYPOOL_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rsa_keypool.json")
 
 # ============================
 # GUI Functions
@@ -102,12 +41,12 @@ def show_comparison():
 
     pf_frame = tk.LabelFrame(result_frame, text="Playfair Result")
     pf_frame.pack(side=tk.LEFT, expand=True, fill=tk.BOTH, padx=5)
-    pf_result = tk.Text(pf_frame, height=10)
+    pf_result = PagedText(pf_frame, height=10, width=40)
     pf_result.pack(expand=True, fill=tk.BOTH)
 
     rsa_frame = tk.LabelFrame(result_frame, text="RSA Result")
     rsa_frame.pack(side=tk.RIGHT, expand=True, fill=tk.BOTH, padx=5)
-    rsa_result = tk.Text(rsa_frame, height=10)
+    rsa_result = PagedText(rsa_frame, height=10, width=40)
     rsa_result.pack(expand=True, fill=tk.BOTH)
 
     time_frame = tk.LabelFrame(win, text="Thời gian xử lý (ms)")
@@ -117,12 +56,15 @@ def show_comparison():
 
     chart_frame = tk.Frame(win)
     chart_frame.pack(padx=10, pady=10, fill=tk.BOTH, expand=True)
+    chart = {}
 
     def export_to_pdf():
         file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("PDF files", "*.pdf")])
         if not file_path:
             return
 
+        from fpdf import FPDF
+
         pdf = FPDF()
         pdf.add_page()
         pdf.set_font("Arial", size=12)
@@ -130,88 +72,169 @@ def show_comparison():
         pdf.cell(200, 10, txt="So sánh mã hóa Playfair vs RSA", ln=True, align="C")
         pdf.ln(10)
         pdf.multi_cell(0, 10, f"Văn bản: {input_text.get('1.0', tk.END).strip()}\n")
-        pdf.multi_cell(0, 10, f"Mã hóa Playfair: {pf_result.get('1.0', tk.END).strip()}\n")
-        pdf.multi_cell(0, 10, f"Mã hóa RSA: {rsa_result.get('1.0', tk.END).strip()}\n")
+        pdf.multi_cell(0, 10, f"Mã hóa Playfair: {pf_result.get()}\n")
+        pdf.multi_cell(0, 10, f"Mã hóa RSA: {rsa_result.get()}\n")
         pdf.multi_cell(0, 10, time_label.cget("text") + "\n")
 
         pdf.output(file_path)
         messagebox.showinfo("Thành công", "Đã xuất kết quả ra PDF!")
 
-    def run_comparison():
-        text = input_text.get("1.0", tk.END).strip()
-
-        # Playfair - Run multiple times to get measurable time
-        pf_matrix = generate_matrix("KEYWORD")
-        start_pf = time.time()
-        for _ in range(1000):  # Repeat 1000 times to make the timing measurable
-            pf_enc = playfair_encrypt(text, pf_matrix)
-        end_pf = time.time()
+    def get_chart():
+        # Tạo một lần khi cần vẽ lần đầu, sau đó chỉ cập nhật dữ liệu
+        if "chart" not in chart:
+            from comparison_chart import ComparisonChart
+            chart["chart"] = ComparisonChart(chart_frame)
+        return chart["chart"]
 
-        pf_result.delete("1.0", tk.END)
-        pf_result.insert(tk.END, pf_enc)
+    def draw_chart(labels, values, colors, title):
+        get_chart().show_bars(labels, values, colors, title)
 
-        # RSA
-        try:
-            start_rsa = time.time()
-            (pubkey, privkey) = rsa.newkeys(512)
-            rsa_enc = rsa.encrypt(text.encode(), pubkey)
-            rsa_dec = rsa.decrypt(rsa_enc, privkey).decode()
-            end_rsa = time.time()
+    def clear_trend():
+        # Chưa vẽ lần nào thì chưa có lịch sử để xóa
+        if "chart" in chart:
+            chart["chart"].clear_history()
 
-            rsa_result.delete("1.0", tk.END)
-            rsa_result.insert(tk.END, f"Encrypted (base64):\n{base64.b64encode(rsa_enc).decode()}\n\nDecrypted:\n{rsa_dec}")
+    runner = BackgroundRunner(win)
+    key_pool = get_pool(COMPARISON_KEY_BITS, KEYPOOL_FILE)
+    key_pool.refill()  # bắt đầu sinh khóa ngay khi mở cửa sổ
 
-            pf_time = round((end_pf - start_pf)*1000 / 1000, 2)  # Average time per encryption
-            rsa_time = round((end_rsa - start_rsa)*1000, 2)
-            time_label.config(text=f"Thời gian mã hóa:\n- Playfair: {pf_time} ms\n- RSA: {rsa_time} ms")
+    def comparison_job(text, progress, cancel):
+        # Chạy ở luồng phụ: không đụng tới widget ở đây
+        import rsa  # type: ignore
 
-            for widget in chart_frame.winfo_children():
-                widget.destroy()
-
-            fig, ax = plt.subplots(figsize=(5, 3))
-            bars = ax.bar(["Playfair", "RSA"], [pf_time, rsa_time], color=["orange", "skyblue"])
-            ax.set_ylabel("Thời gian (ms)")
-            ax.set_title("So sánh thời gian mã hóa")
-            ax.bar_label(bars, fmt='%.2f ms')
+        # Playfair - Run multiple times to get measurable time
+        pf_cipher = get_cipher("KEYWORD")
+        pf_enc = pf_cipher.encrypt(text)  # warm-up
+        start_pf = time.perf_counter_ns()
+        for i in range(1000):  # Repeat 1000 times to make the timing measurable
+            pf_enc = pf_cipher.encrypt(text)
+            if i % 50 == 0:
+                progress(i / 1000 * 0.5, "Playfair...")
+        end_pf = time.perf_counter_ns()
+
+        # RSA - lấy khóa từ kho sinh sẵn, đo riêng, không tính vào thời gian mã hóa
+        progress(0.5, "RSA: lấy khóa...")
+        start_key = time.perf_counter_ns()
+        (pubkey, privkey) = key_pool.get()
+        end_key = time.perf_counter_ns()
+
+        progress(0.9, "RSA: mã hóa...")
+        start_rsa = time.perf_counter_ns()
+        rsa_enc = rsa.encrypt(text.encode(), pubkey)
+        rsa_dec = rsa.decrypt(rsa_enc, privkey).decode()
+        end_rsa = time.perf_counter_ns()
+
+        return {
+            "pf_enc": pf_enc,
+            "rsa_enc": rsa_enc,
+            "rsa_dec": rsa_dec,
+            "pf_time": round((end_pf - start_pf) / 1e6 / 1000, 4),  # Average time per encryption
+            "rsa_time": round((end_rsa - start_rsa) / 1e6, 2),
+            "key_time": round((end_key - start_key) / 1e6, 2),
+            "pool": key_pool.stats(),
+        }
 
-            canvas = FigureCanvasTkAgg(fig, master=chart_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+    def run_comparison():
+        if runner.busy:
+            return
+        text = input_text.get("1.0", tk.END).strip()
 
+        def done(res):
+            pf_result.set(res["pf_enc"])
+            rsa_result.set(f"Encrypted (base64):\n{base64.b64encode(res['rsa_enc']).decode()}\n\nDecrypted:\n{res['rsa_dec']}")
+            pool = res["pool"]
+            refill = "-" if pool["refill_ms_median"] is None else f"{pool['refill_ms_median']:.0f} ms"
+            time_label.config(text=f"Thời gian mã hóa:\n- Playfair: {res['pf_time']} ms\n- RSA: {res['rsa_time']} ms (lấy khóa: {res['key_time']} ms)\n"
+                                   f"Kho khóa {pool['bits']} bit: còn {pool['available']}, hit {pool['hits']}, miss {pool['misses']}, "
+                                   f"sinh lại trung vị {refill}")
+            draw_chart(["Playfair", "RSA"], [res["pf_time"], res["rsa_time"]], ["orange", "skyblue"], "So sánh thời gian mã hóa")
+            get_chart().add_run(res["pf_time"], res["rsa_time"])
+
+        def failed(e):
+            rsa_result.set(f"Lỗi: {e}")
+
+        def on_progress(fraction, status):
+            if fraction is not None:
+                progress_bar["value"] = fraction * 100
+            status_label.config(text=status or "")
+
+        def finish(kind):
+            progress_bar["value"] = 100 if kind == "done" else 0
+            status_label.config(text="Đã hủy" if kind == "cancelled" else "")
+            compare_btn.config(state=tk.NORMAL)
+
+        compare_btn.config(state=tk.DISABLED)
+        progress_bar["value"] = 0
+        runner.start(lambda progress, cancel: comparison_job(text, progress, cancel), done, failed, on_progress, finish)
+
+    def show_saved_run():
+        # Hiển thị kết quả đã lưu bởi benchmark.py (JSON/CSV)
+        file_path = filedialog.askopenfilename(filetypes=[("Benchmark results", "*.json *.csv")])
+        if not file_path:
+            return
+        try:
+            rows = load_results(file_path)
         except Exception as e:
-            rsa_result.delete("1.0", tk.END)
-            rsa_result.insert(tk.END, f"Lỗi: {e}")
+            messagebox.showerror("Lỗi", f"Không đọc được file: {e}")
+            return
 
-    tk.Button(win, text="So sánh mã hóa", command=run_comparison, bg="lightblue").pack(pady=10)
+        enc_rows = [r for r in rows if r["operation"] == "encrypt"]
+        if not enc_rows:
+            messagebox.showerror("Lỗi", "File không có kết quả mã hóa")
+            return
+        size = max(r["message_size"] for r in enc_rows)
+        enc_rows = [r for r in enc_rows if r["message_size"] == size]
+
+        pf_result.set(format_table(rows))
+        time_label.config(text=f"Kết quả đã lưu: {file_path}\nMedian thời gian mã hóa, thông điệp {size} ký tự")
+        labels = [f"{r['algorithm']}\n{r['key_size']}" for r in enc_rows]
+        draw_chart(labels, [r["median_ms"] for r in enc_rows], "skyblue", f"Median encrypt ({size} ký tự)")
+
+    compare_btn = tk.Button(win, text="So sánh mã hóa", command=run_comparison, bg="lightblue")
+    compare_btn.pack(pady=10)
+    progress_frame = tk.Frame(win)
+    progress_frame.pack()
+    progress_bar = ttk.Progressbar(progress_frame, mode="determinate", length=300)
+    progress_bar.pack(side=tk.LEFT)
+    tk.Button(progress_frame, text="Hủy", command=lambda: runner.cancel()).pack(side=tk.LEFT, padx=5)
+    status_label = tk.Label(win, text="")
+    status_label.pack()
     tk.Button(win, text="Xuất PDF kết quả", command=export_to_pdf, bg="lightgreen").pack(pady=5)
+    tk.Button(win, text="Mở kết quả benchmark", command=show_saved_run).pack(pady=5)
+    tk.Button(win, text="Xóa lịch sử so sánh", command=clear_trend).pack(pady=5)
 
 # ============================
 # GUI Layout
 # ============================
-root = tk.Tk()
-root.title("ĐỒ ÁN NHÓM  - BẢO MẬT MẠNG MÁY TÍNH & HỆ THỐNG")
-root.geometry("700x500")
-root.configure(bg="white")
+# Bảo vệ bằng __main__ để tiến trình con (ProcessPoolExecutor, spawn) không dựng lại GUI
+if __name__ == "__main__":
+    root = tk.Tk()
+    root.title("ĐỒ ÁN NHÓM  - BẢO MẬT MẠNG MÁY TÍNH & HỆ THỐNG")
+    root.geometry("750x720")
+    root.configure(bg="white")
+
+    tk.Label(root, text="ĐỒ ÁN MÔN HỌC", font=("Helvetica", 18, "bold"), bg="white").pack(pady=5)
+    tk.Label(root, text="BẢO MẬT MẠNG MÁY TÍNH & HỆ THỐNG", font=("Helvetica", 20, "bold"), bg="white", fg="black").pack()
 
-tk.Label(root, text="ĐỒ ÁN MÔN HỌC", font=("Helvetica", 18, "bold"), bg="white").pack(pady=5)
-tk.Label(root, text="BẢO MẬT MẠNG MÁY TÍNH & HỆ THỐNG", font=("Helvetica", 20, "bold"), bg="white", fg="black").pack()
+    tk.Label(root, text="Nhóm: Lớp 10_ĐH_CNPM1", font=("Helvetica", 12), bg="white").pack()
+    tk.Label(root, text="CÁC THÀNH VIÊN:", font=("Helvetica", 12, "bold"), bg="white").pack(pady=5)
 
-tk.Label(root, text="Nhóm: Lớp 10_ĐH_CNPM1", font=("Helvetica", 12), bg="white").pack()
-tk.Label(root, text="CÁC THÀNH VIÊN:", font=("Helvetica", 12, "bold"), bg="white").pack(pady=5)
+    tk.Label(root, text="Nguyễn Thái Hoành\tMSSV: 1050080014", font=("Helvetica", 11), bg="white").pack()
+    tk.Label(root, text="Nguyễn Hoàng Anh\tMSSV: 1050080002", font=("Helvetica", 11), bg="white").pack()
 
-tk.Label(root, text="Nguyễn Thái Hoành\tMSSV: 1050080014", font=("Helvetica", 11), bg="white").pack()
-tk.Label(root, text="Nguyễn Hoàng Anh\tMSSV: 1050080002", font=("Helvetica", 11), bg="white").pack()
+    frame = tk.Frame(root, bg="white")
+    frame.pack(pady=30)
 
-frame = tk.Frame(root, bg="white")
-frame.pack(pady=30)
+    playfair_btn = tk.Button(frame, text="PLAYFAIR", font=("Helvetica", 14, "bold"), fg="#FF5733", width=15, height=2, command=show_playfair)
+    playfair_btn.grid(row=0, column=0, padx=20)
 
-playfair_btn = tk.Button(frame, text="PLAYFAIR", font=("Helvetica", 14, "bold"), fg="#FF5733", width=15, height=2, command=show_playfair)
-playfair_btn.grid(row=0, column=0, padx=20)
+    rsa_btn = tk.Button(frame, text="RSA", font=("Helvetica", 14, "bold"), fg="#FF5733", width=15, height=2, command=show_rsa)
+    rsa_btn.grid(row=0, column=1, padx=20)
 
-rsa_btn = tk.Button(frame, text="RSA", font=("Helvetica", 14, "bold"), fg="#FF5733", width=15, height=2, command=show_rsa)
-rsa_btn.grid(row=0, column=1, padx=20)
+    compare_btn = tk.Button(frame, text="SO SÁNH", font=("Helvetica", 14, "bold"), fg="green", width=32, height=2, command=show_comparison)
+    compare_btn.grid(row=1, column=0, columnspan=2, pady=10)
 
-compare_btn = tk.Button(frame, text="SO SÁNH", font=("Helvetica", 14, "bold"), fg="green", width=32, height=2, command=show_comparison)
-compare_btn.grid(row=1, column=0, columnspan=2, pady=10)
+    build_instrument_panel(root).pack(padx=10, pady=5, fill=tk.X)
 
-root.mainloop()
\ No newline at end of file
+    root.mainloop()
+    close_pools()
\ No newline at end of file
@@ -0,0 +1,95 @@
+from functools import lru_cache
+
+import numpy as np
+
+from instrument import timed
+from playfair_core import CIPHER_CACHE_SIZE, get_cipher, normalize_chunk, normalize_key, pair_text
+
+# ==== Playfair theo lô (NumPy) ====
+# Mã hóa/giải mã nhiều thông điệp ngắn cùng một khóa: ghép mọi cặp ký tự
+# thành một mảng uint8 rồi áp 3 quy tắc (cùng hàng, cùng cột, hình chữ nhật)
+# bằng mặt nạ trên toàn bộ mảng thay vì vòng lặp Python cho từng thông điệp.
+
+class PlayfairBatch:
+    def __init__(self, matrix, size=None):
+        self.size = size or len(matrix)
+        # Ô trống (ma trận thiếu ký tự) giữ giá trị 0 để phát hiện lỗi
+        self.grid = np.zeros((self.size, self.size), dtype=np.uint8)
+        self.rows = np.full(256, -1, dtype=np.int16)
+        self.cols = np.full(256, -1, dtype=np.int16)
+        for i, row in enumerate(matrix):
+            for j, c in enumerate(row):
+                self.grid[i, j] = ord(c)
+                self.rows[ord(c)] = i
+                self.cols[ord(c)] = j
+
+    @timed("digraph", lambda args, out: (len(out) // 2, len(out)))
+    def _apply(self, flat, step):
+        data = np.frombuffer(flat.encode('ascii'), dtype=np.uint8).reshape(-1, 2)
+        a, b = data[:, 0], data[:, 1]
+        r1, c1 = self.rows[a], self.cols[a]
+        r2, c2 = self.rows[b], self.cols[b]
+        if (r1 < 0).any() or (r2 < 0).any():
+            raise ValueError("Text contains characters not in the matrix")
+
+        same_row = r1 == r2
+        same_col = (c1 == c2) & ~same_row
+        rect = ~(same_row | same_col)
+
+        out_r1, out_c1 = r1.copy(), c1.copy()
+        out_r2, out_c2 = r2.copy(), c2.copy()
+        out_c1[same_row] = (c1[same_row] + step) % self.size
+        out_c2[same_row] = (c2[same_row] + step) % self.size
+        out_r1[same_col] = (r1[same_col] + step) % self.size
+        out_r2[same_col] = (r2[same_col] + step) % self.size
+        out_c1[rect] = c2[rect]
+        out_c2[rect] = c1[rect]
+
+        out = np.empty_like(data)
+        out[:, 0] = self.grid[out_r1, out_c1]
+        out[:, 1] = self.grid[out_r2, out_c2]
+        if not out.all():
+            raise ValueError("Digraph falls outside the matrix")
+        return out.tobytes().decode('ascii')
+
+    def _run(self, texts, step):
+        lengths = [len(t) for t in texts]
+        flat = self._apply(''.join(texts), step) if any(lengths) else ''
+        result, pos = [], 0
+        for n in lengths:
+            result.append(flat[pos:pos+n])
+            pos += n
+        return result
+
+    def encrypt(self, messages):
+        # Chuẩn hóa cả lô trong một lần gọi, tách lại bằng ký tự NUL
+        texts = normalize_chunk('\0'.join(messages), self.size, keep='\0').split('\0')
+        if len(texts) != len(messages):
+            texts = [normalize_chunk(m, self.size) for m in messages]
+        return self._run([pair_text(t) for t in texts], 1)
+
+    def decrypt(self, ciphertexts):
+        for c in ciphertexts:
+            if len(c) % 2:
+                raise ValueError("Ciphertext has odd length")
+        return self._run(list(ciphertexts), -1)
+
+# Cache LRU các bảng tra NumPy theo khóa đã chuẩn hóa, giống _compiled_cipher
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def _batch_engine(norm_key, size):
+    return PlayfairBatch(get_cipher(norm_key, size).matrix, size)
+
+def get_batch(key, size=5):
+    return _batch_engine(normalize_key(key, size), size)
+
+def batch_cache_info():
+    return _batch_engine.cache_info()
+
+def batch_cache_clear():
+    _batch_engine.cache_clear()
+
+def playfair_encrypt_batch(messages, key, size=5):
+    return get_batch(key, size).encrypt(messages)
+
+def playfair_decrypt_batch(ciphertexts, key, size=5):
+    return get_batch(key, size).decrypt(ciphertexts)
@@ -0,0 +1,260 @@
+import os
+import re
+from bisect import bisect_left
+from functools import lru_cache
+
+from instrument import count, timed
+
+# ==== Hàm hỗ trợ Playfair ====
+def number_to_text(num_str):
+    num_dict = {"0": "ZERO", "1": "ONE", "2": "TWO", "3": "THREE", "4": "FOUR",
+                "5": "FIVE", "6": "SIX", "7": "SEVEN", "8": "EIGHT", "9": "NINE"}
+    return "".join(num_dict[digit] for digit in num_str)
+
+DIGIT_WORDS = [(d, number_to_text(d)) for d in "0123456789"]
+
+# ==== Bảng chữ cái theo kích thước ma trận ====
+# 5x5: 25 chữ (J gộp vào I), chữ số phải đổi thành chữ (1 -> ONE) nên bản rõ dài ra.
+# 6x6: đủ A-Z và 0-9, giữ nguyên chữ số và chữ J.
+ALPHABETS = {5: "ABCDEFGHIKLMNOPQRSTUVWXYZ", 6: "ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"}
+
+def alphabet_for(size):
+    if size not in ALPHABETS:
+        raise ValueError(f"Unsupported matrix size {size}")
+    return ALPHABETS[size]
+
+@lru_cache(maxsize=None)
+def _outside_alphabet(size, keep=""):
+    return re.compile(f"[^{re.escape(alphabet_for(size) + keep)}]+")
+
+@timed("normalize", lambda args, out: (1, len(args[0])))
+def normalize_chunk(text, size=5, keep=""):
+    # Chuẩn hóa không cần trạng thái: mỗi ký tự được xử lý độc lập nên dùng được cho từng chunk.
+    # Bỏ mọi ký tự không có trong ma trận (khoảng trắng, xuống dòng, dấu câu...);
+    # keep: ký tự ngoài bảng chữ cái vẫn giữ lại (vd. dấu phân cách của bản mã hóa theo lô).
+    text = text.upper()
+    if size == 5:
+        text = text.replace("J", "I")
+        for digit, word in DIGIT_WORDS:
+            if digit in text:
+                text = text.replace(digit, word)
+    return _outside_alphabet(size, keep).sub("", text)
+
+def strip_ciphertext(text):
+    # Bản mã có thể bị xuống dòng/cách khoảng khi sao chép; bỏ khoảng trắng trước khi tra bảng
+    return ''.join(text.split())
+
+def create_matrix(key, size=5):
+    # Khóa (bỏ ký tự lặp) rồi phần còn lại của bảng chữ cái, cắt thành size hàng
+    cells = ''.join(dict.fromkeys(normalize_key(key, size) + alphabet_for(size)))
+    return [list(cells[i:i+size]) for i in range(0, size*size, size)]
+
+# Các cặp khác nhau liên tiếp rồi tới chữ cái bị lặp ở vị trí chẵn (cần chèn 'X')
+EVEN_DOUBLE = re.compile(r"(?:(.)(?!\1).)*?(.)(?=\2)", re.S)
+
+@timed("digraph", lambda args, out: (len(out) // 2, len(args[0])))
+def pair_text(text, inserted=None):
+    # Ghép cặp văn bản đã chuẩn hóa: chữ lặp trong một cặp thì chèn 'X', lẻ cuối thì thêm 'X'.
+    # Mỗi lần match của regex nhảy tới chữ lặp kế tiếp thay vì duyệt từng ký tự.
+    # inserted (tùy chọn) nhận vị trí các chữ được chèn 'X' ngay sau.
+    out, pos = [], 0
+    while True:
+        m = EVEN_DOUBLE.match(text, pos)
+        if not m:
+            break
+        out.append(m.group())
+        out.append('X')
+        pos = m.end()
+        if inserted is not None:
+            inserted.append(pos - 1)
+    out.append(text[pos:])
+    if (len(text) - pos) % 2:
+        out.append('X')
+    return ''.join(out)
+
+# ==== Playfair đã biên dịch (tra bảng O(1)) ====
+class PlayfairCipher:
+    # Dựng một lần từ ma trận NxN của create_matrix:
+    # - cells: ma trận phẳng, ô k nằm ở hàng k // size, cột k % size
+    # - pos: ký tự -> (hàng, cột)
+    # - enc_table / dec_table: cặp ký tự -> cặp ký tự (625 cặp cho 5x5, 1296 cho 6x6),
+    #   thay cho việc dò tuyến tính vị trí từng ký tự trong ma trận; số lần tra bảng được
+    #   đếm vào bộ đếm "digraph_lookup"
+    def __init__(self, matrix, size=None):
+        self.matrix = matrix
+        self.size = size or len(matrix)
+        self.cells = ''.join(''.join(row) for row in matrix)
+        if len(self.cells) != self.size * self.size or len(set(self.cells)) != len(self.cells):
+            raise ValueError(f"Matrix must hold {self.size * self.size} distinct symbols")
+        self.pos = {c: divmod(k, self.size) for k, c in enumerate(self.cells)}
+        self.enc_table = {}
+        self.dec_table = {}
+        for a in self.cells:
+            for b in self.cells:
+                self.enc_table[a + b] = self._apply(a, b, 1)
+                self.dec_table[a + b] = self._apply(a, b, -1)
+
+    def _apply(self, a, b, step):
+        cells, size = self.cells, self.size
+        r1, c1 = self.pos[a]
+        r2, c2 = self.pos[b]
+        if r1 == r2:
+            return cells[r1*size + (c1+step)%size] + cells[r2*size + (c2+step)%size]
+        elif c1 == c2:
+            return cells[((r1+step)%size)*size + c1] + cells[((r2+step)%size)*size + c2]
+        else:
+            return cells[r1*size + c2] + cells[r2*size + c1]
+
+    def encrypt(self, text):
+        # Các bước con đã được đo riêng (normalize / digraph)
+        return self.encrypt_paired(pair_text(normalize_chunk(text, self.size)))
+
+    @timed("digraph", lambda args, out: (len(out) // 2, len(out)))
+    def encrypt_paired(self, paired):
+        # paired: kết quả pair_text (đã chuẩn hóa, đã chèn 'X', độ dài chẵn)
+        table = self.enc_table
+        count("digraph_lookup", len(paired) // 2)
+        return ''.join([table[paired[i:i+2]] for i in range(0, len(paired), 2)])
+
+    @timed("digraph", lambda args, out: (len(out) // 2, len(out)))
+    def decrypt(self, text):
+        table = self.dec_table
+        text = strip_ciphertext(text)
+        count("digraph_lookup", len(text) // 2)
+        return ''.join([table[text[i:i+2]] for i in range(0, len(text), 2)])
+
+# ==== Cache LRU các ma trận đã biên dịch ====
+CIPHER_CACHE_SIZE = 32
+
+def normalize_key(key, size=5):
+    # Hai khóa cho cùng ma trận (khác hoa/thường, J/I, ký tự lặp...) dùng chung một mục cache
+    key = key.upper()
+    if size == 5:
+        key = key.replace("J", "I")
+    alphabet = alphabet_for(size)
+    return ''.join(dict.fromkeys(c for c in key if c in alphabet))
+
+@lru_cache(maxsize=CIPHER_CACHE_SIZE)
+def _compiled_cipher(norm_key, size):
+    return PlayfairCipher(create_matrix(norm_key, size), size)
+
+def get_cipher(key, size=5):
+    return _compiled_cipher(normalize_key(key, size), size)
+
+def cipher_cache_info():
+    return _compiled_cipher.cache_info()
+
+def cipher_cache_clear():
+    _compiled_cipher.cache_clear()
+
+# ==== Mã hóa Playfair theo luồng (file lớn) ====
+CHUNK_SIZE = 64 * 1024
+
+def read_chunks(f, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = f.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_digraphs(chunks, size=5):
+    # Giữ ký tự lẻ cuối chunk (pending) để ghép với chunk sau, cùng quy tắc với pair_text
+    pending = None
+    for chunk in chunks:
+        pairs = []
+        for ch in normalize_chunk(chunk, size):
+            if pending is None:
+                pending = ch
+            elif pending == ch:
+                pairs.append(pending + 'X')
+            else:
+                pairs.append(pending + ch)
+                pending = None
+        if pairs:
+            yield pairs
+    if pending is not None:
+        yield [pending + 'X']
+
+def playfair_encrypt_stream(chunks, cipher):
+    table = cipher.enc_table
+    for pairs in iter_digraphs(chunks, cipher.size):
+        count("digraph_lookup", len(pairs))
+        yield ''.join([table[p] for p in pairs])
+
+def playfair_decrypt_stream(chunks, cipher):
+    table = cipher.dec_table
+    carry = ""
+    for chunk in chunks:
+        chunk = carry + strip_ciphertext(chunk)
+        end = len(chunk) - len(chunk) % 2
+        carry = chunk[end:]
+        count("digraph_lookup", end // 2)
+        yield ''.join([table[chunk[i:i+2]] for i in range(0, end, 2)])
+    if carry:
+        raise ValueError("Ciphertext has odd length")
+
+def playfair_process_file(src, dst, cipher, decrypt=False, chunk_size=CHUNK_SIZE, encoding=None):
+    stream = playfair_decrypt_stream if decrypt else playfair_encrypt_stream
+    try:
+        with open(src, 'r', encoding=encoding) as fin, open(dst, 'w') as fout:
+            for out in stream(read_chunks(fin, chunk_size), cipher):
+                fout.write(out)
+    except BaseException:
+        # Không để lại file kết quả dở dang
+        if os.path.exists(dst):
+            os.remove(dst)
+        raise
+
+# ==== Mã hóa tăng dần (chế độ LIVE khi gõ) ====
+def common_prefix_len(a, b):
+    # Tìm nhị phân trên lát cắt chuỗi (so sánh ở tầng C) thay vì so từng ký tự
+    lo, hi = 0, min(len(a), len(b))
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+def common_suffix_len(a, b, limit):
+    lo, hi = 0, min(len(a), len(b), limit)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if a[len(a) - mid:len(a) - lo] == b[len(b) - mid:len(b) - lo]:
+            lo = mid
+        else:
+            hi = mid - 1
+    return lo
+
+class IncrementalPlayfair:
+    # Giữ bản chuẩn hóa, vị trí chèn 'X' và bản mã của lần trước. Một chỉnh sửa chỉ làm
+    # thay đổi cách ghép cặp từ điểm sửa trở đi, nên chỉ ghép cặp/mã hóa lại phần đuôi.
+    def __init__(self, cipher):
+        self.cipher = cipher
+        self.norm = ""
+        self.inserted = []
+        self.result = ""
+
+    def update(self, raw):
+        # Trả về (start, end, text): thay self.result[start:end] cũ bằng text
+        norm = normalize_chunk(raw, self.cipher.size)
+        same = common_prefix_len(self.norm, norm)
+        # Cặp bắt đầu trước same - 2 chỉ đọc các ký tự chưa đổi nên giữ nguyên
+        start = max(0, same - 2)
+        k = bisect_left(self.inserted, start)
+        if (start + k) % 2:
+            start -= 1
+        k = bisect_left(self.inserted, start)
+        out_start = start + k
+
+        tail_inserted = []
+        tail = self.cipher.encrypt_paired(pair_text(norm[start:], tail_inserted))
+        old_tail = self.result[out_start:]
+        pre = common_prefix_len(old_tail, tail)
+        suf = common_suffix_len(old_tail, tail, min(len(old_tail), len(tail)) - pre)
+
+        self.norm = norm
+        self.inserted = self.inserted[:k] + [start + i for i in tail_inserted]
+        self.result = self.result[:out_start] + tail
+        return out_start + pre, out_start + len(old_tail) - suf, tail[pre:len(tail) - suf]
@@ -0,0 +1,276 @@
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+from playfair_core import PlayfairCipher
+
+# ==== Phá mã Playfair: luyện kim mô phỏng (simulated annealing) ====
+# Điểm của một bản rõ ứng viên = tổng log10 xác suất các quadgram (4 chữ liên tiếp),
+# tra trong một mảng NumPy phẳng kích thước 26^4. Khóa 5x5 được đột biến tại chỗ
+# (đổi 2 ô, đổi 2 hàng, đổi 2 cột, đảo thứ tự hàng/cột) rồi hoàn tác nếu không nhận.
+
+SQUARE_ALPHABET = "ABCDEFGHIKLMNOPQRSTUVWXYZ"
+N_QUADGRAMS = 26 ** 4
+REPORT_EVERY = 10000  # số vòng lặp giữa hai lần một lần khởi động lại báo tiến độ
+PROGRESS_INTERVAL = 1.0  # giãn cách tối thiểu (giây) giữa hai lần gọi on_progress
+
+# Chỉ số ký tự trong bảng 5x5 (0..24) -> chỉ số trong A-Z (0..25) cho bảng quadgram
+SQUARE_TO_ALPHA = np.array([ord(c) - 65 for c in SQUARE_ALPHABET], dtype=np.int64)
+CHAR_TO_SQUARE = np.full(256, -1, dtype=np.int16)
+for _i, _c in enumerate(SQUARE_ALPHABET):
+    CHAR_TO_SQUARE[ord(_c)] = _i
+del _i, _c
+
+def _decrypt_positions():
+    # Quy tắc giải mã chỉ phụ thuộc vị trí: (ô a, ô b) -> (ô ra 1, ô ra 2), dùng cho mọi khóa
+    table = np.empty((625, 2), dtype=np.int64)
+    for pa in range(25):
+        for pb in range(25):
+            r1, c1, r2, c2 = pa // 5, pa % 5, pb // 5, pb % 5
+            if r1 == r2:
+                out = (r1 * 5 + (c1 + 4) % 5, r2 * 5 + (c2 + 4) % 5)
+            elif c1 == c2:
+                out = (((r1 + 4) % 5) * 5 + c1, ((r2 + 4) % 5) * 5 + c2)
+            else:
+                out = (r1 * 5 + c2, r2 * 5 + c1)
+            table[pa * 25 + pb] = out
+    return table
+
+DECRYPT_POSITIONS = _decrypt_positions()
+
+# ==== Bảng quadgram ====
+def table_from_counts(counts):
+    counts = np.asarray(counts, dtype=np.float64)
+    total = counts.sum()
+    if total == 0:
+        raise ValueError("Quadgram counts are empty")
+    table = np.full(N_QUADGRAMS, math.log10(0.01 / total), dtype=np.float64)
+    seen = counts > 0
+    table[seen] = np.log10(counts[seen] / total)
+    return table.astype(np.float32)
+
+def quadgram_index(letters):
+    # letters: mảng chỉ số A-Z (0..25)
+    return letters[:-3] * 17576 + letters[1:-2] * 676 + letters[2:-1] * 26 + letters[3:]
+
+def quadgrams_from_corpus(text):
+    data = np.frombuffer(text.upper().encode('ascii', 'ignore'), dtype=np.uint8)
+    letters = data[(data >= 65) & (data <= 90)].astype(np.int64) - 65
+    return table_from_counts(np.bincount(quadgram_index(letters), minlength=N_QUADGRAMS))
+
+def load_quadgrams(path):
+    # .npy: bảng đã tính sẵn; còn lại: mỗi dòng "TION 13168375"
+    if path.endswith(".npy"):
+        return np.load(path)
+    counts = np.zeros(N_QUADGRAMS, dtype=np.float64)
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) != 2 or len(parts[0]) != 4 or not parts[0].isalpha():
+                continue
+            q = np.array([ord(c) - 65 for c in parts[0].upper()])
+            counts[quadgram_index(q)[0]] += float(parts[1])
+    return table_from_counts(counts)
+
+# ==== Luyện kim ====
+class PlayfairAnnealer:
+    def __init__(self, ciphertext, table):
+        data = np.frombuffer(ciphertext.upper().replace("J", "I").encode('ascii', 'ignore'), dtype=np.uint8)
+        ids = CHAR_TO_SQUARE[data]
+        ids = ids[ids >= 0].astype(np.int64)
+        if len(ids) < 8:
+            raise ValueError("Ciphertext too short")
+        ids = ids[:len(ids) - len(ids) % 2]
+        self.a = ids[0::2]
+        self.b = ids[1::2]
+        self.table = table
+
+    def decrypt(self, key, pos):
+        # key[ô] = chữ, pos[chữ] = ô; trả về chỉ số chữ (0..24) của bản rõ
+        return key[DECRYPT_POSITIONS[pos[self.a] * 25 + pos[self.b]]].ravel()
+
+    def score(self, key, pos):
+        letters = SQUARE_TO_ALPHA[self.decrypt(key, pos)]
+        return float(self.table[quadgram_index(letters)].sum())
+
+    def run(self, iterations=2000000, t_start=20.0, t_end=0.01, seed=None, start_key=None, report=None):
+        # report(số vòng đã chạy, điểm tốt nhất, khóa tốt nhất) được gọi mỗi REPORT_EVERY vòng
+        rng = random.Random(seed)
+        if start_key:
+            key = np.array([SQUARE_ALPHABET.index(c) for c in start_key], dtype=np.int64)
+        else:
+            key = np.array(rng.sample(range(25), 25), dtype=np.int64)
+        grid = key.reshape(5, 5)  # view: đột biến grid là đột biến key
+        pos = np.empty(25, dtype=np.int64)
+        pos[key] = np.arange(25)
+        current = self.score(key, pos)
+        best, best_key = current, key.copy()
+        start = time.perf_counter()
+        for it in range(iterations):
+            temp = t_start + (t_end - t_start) * it / iterations
+            move = rng.random()
+            if move < 0.9:
+                i, j = rng.sample(range(25), 2)
+                key[i], key[j] = key[j], key[i]
+                undo = ("cell", i, j)
+            elif move < 0.95:
+                i, j = rng.sample(range(5), 2)
+                grid[[i, j]] = grid[[j, i]]
+                undo = ("row", i, j)
+            elif move < 0.98:
+                i, j = rng.sample(range(5), 2)
+                grid[:, [i, j]] = grid[:, [j, i]]
+                undo = ("col", i, j)
+            elif move < 0.99:
+                grid[:] = grid[::-1].copy()
+                undo = ("flip_rows", 0, 0)
+            else:
+                grid[:] = grid[:, ::-1].copy()
+                undo = ("flip_cols", 0, 0)
+            pos[key] = np.arange(25)
+
+            candidate = self.score(key, pos)
+            delta = candidate - current
+            if delta >= 0 or rng.random() < math.exp(delta / temp):
+                current = candidate
+                if current > best:
+                    best, best_key = current, key.copy()
+            else:
+                kind, i, j = undo
+                if kind == "cell":
+                    key[i], key[j] = key[j], key[i]
+                elif kind == "row":
+                    grid[[i, j]] = grid[[j, i]]
+                elif kind == "col":
+                    grid[:, [i, j]] = grid[:, [j, i]]
+                elif kind == "flip_rows":
+                    grid[:] = grid[::-1].copy()
+                else:
+                    grid[:] = grid[:, ::-1].copy()
+                pos[key] = np.arange(25)
+            if report is not None and (it + 1) % REPORT_EVERY == 0:
+                report(it + 1, best, key_to_string(best_key))
+        elapsed = time.perf_counter() - start
+        return best, key_to_string(best_key), iterations, elapsed
+
+def key_to_string(key):
+    return ''.join(SQUARE_ALPHABET[i] for i in key)
+
+# ==== Chạy song song nhiều lần khởi động lại ====
+_worker = {}
+
+def _init_worker(ciphertext, table, queue=None):
+    # queue: multiprocessing.Queue nhận (lần khởi động, số vòng, điểm, khóa) để báo tiến độ giữa chừng
+    _worker["annealer"] = PlayfairAnnealer(ciphertext, table)
+    _worker["queue"] = queue
+
+def _run_restart(args, report=None):
+    index, iterations, t_start, t_end, seed = args
+    queue = _worker.get("queue")
+    if report is None and queue is not None:
+        report = lambda its, score, key: queue.put((index, its, score, key))
+    return _worker["annealer"].run(iterations, t_start, t_end, seed, report=report)
+
+def crack(ciphertext, table, restarts=None, iterations=2000000, t_start=20.0, t_end=0.01,
+          workers=None, seed=None, on_progress=None):
+    # on_progress(số lần đã xong, tổng, điểm tốt nhất, khóa tốt nhất, vòng lặp/giây): gọi khi
+    # mỗi lần khởi động lại xong và trong lúc chạy (tối đa mỗi PROGRESS_INTERVAL giây một lần)
+    workers = workers or os.cpu_count() or 1
+    restarts = restarts or workers
+    rng = random.Random(seed)
+    jobs = [(i, iterations, t_start, t_end, rng.getrandbits(64)) for i in range(restarts)]
+    best = (-math.inf, None)
+    progress_its = [0] * restarts  # số vòng đã chạy của từng lần khởi động lại
+    total_its, done = 0, 0
+    start = last_report = time.perf_counter()
+
+    def update(index, its, score, key, finished=False):
+        nonlocal best, total_its, done, last_report
+        # Báo cáo giữa chừng có thể tới sau kết quả cuối (hàng đợi trễ) nên chỉ lấy giá trị lớn hơn
+        progress_its[index] = max(progress_its[index], its)
+        if score > best[0]:
+            best = (score, key)
+        if finished:
+            done += 1
+            total_its += its
+        now = time.perf_counter()
+        if on_progress and (finished or now - last_report >= PROGRESS_INTERVAL):
+            last_report = now
+            on_progress(done, restarts, best[0], best[1], sum(progress_its) / max(now - start, 1e-9))
+
+    if workers == 1:
+        _init_worker(ciphertext, table)
+        for job in jobs:
+            index = job[0]
+            report = (lambda its, score, key: update(index, its, score, key)) if on_progress else None
+            score, key, its, _ = _run_restart(job, report)
+            update(index, its, score, key, finished=True)
+    else:
+        import multiprocessing
+        from queue import Empty
+        from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+        queue = multiprocessing.Queue() if on_progress else None
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(ciphertext, table, queue)) as pool:
+            futures = {pool.submit(_run_restart, job): job[0] for job in jobs}
+            pending = set(futures)
+            while pending:
+                finished, pending = wait(pending, timeout=PROGRESS_INTERVAL / 4, return_when=FIRST_COMPLETED)
+                while queue is not None:
+                    try:
+                        update(*queue.get_nowait())
+                    except Empty:
+                        break
+                for f in finished:
+                    score, key, its, _ = f.result()
+                    update(futures[f], its, score, key, finished=True)
+    elapsed = time.perf_counter() - start
+    return {"score": best[0], "key": best[1], "iterations": total_its,
+            "seconds": elapsed, "iterations_per_second": total_its / max(elapsed, 1e-9)}
+
+def key_matrix(key):
+    return [list(key[i:i+5]) for i in range(0, 25, 5)]
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Phá mã Playfair 5x5 bằng simulated annealing + quadgram")
+    parser.add_argument("ciphertext", help="file chứa bản mã")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--quadgrams", help="file quadgram ('TION 13168375' mỗi dòng) hoặc bảng .npy")
+    source.add_argument("--corpus", help="văn bản tiếng Anh để tự đếm quadgram")
+    parser.add_argument("--save-table", help="lưu bảng quadgram ra file .npy để dùng lại")
+    parser.add_argument("--restarts", type=int)
+    parser.add_argument("--iterations", type=int, default=2000000, help="số vòng lặp mỗi lần khởi động lại")
+    parser.add_argument("--workers", type=int)
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if args.quadgrams:
+        table = load_quadgrams(args.quadgrams)
+    else:
+        with open(args.corpus, errors='ignore') as f:
+            table = quadgrams_from_corpus(f.read())
+    if args.save_table:
+        np.save(args.save_table, table)
+    with open(args.ciphertext) as f:
+        ciphertext = f.read()
+
+    def progress(done, total, score, key, rate):
+        print(f"[{done}/{total}] best {score:.1f}  key {key}  {rate:,.0f} it/s", flush=True)
+
+    result = crack(ciphertext, table, args.restarts, args.iterations, workers=args.workers,
+                   seed=args.seed, on_progress=progress)
+    cipher = PlayfairCipher(key_matrix(result["key"]), 5)
+    letters = ''.join(c for c in ciphertext.upper().replace("J", "I") if c in SQUARE_ALPHABET)
+    print(f"Best key: {result['key']}  score {result['score']:.1f}  "
+          f"{result['iterations_per_second']:,.0f} it/s over {result['seconds']:.1f} s")
+    print("\n".join(' '.join(row) for row in cipher.matrix))
+    print(cipher.decrypt(letters[:len(letters) - len(letters) % 2]))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,96 +2,17 @@ import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext
 import os
 
-# ==== Hàm hỗ trợ Playfair ====
-def number_to_text(num_str):
-    num_dict = {"0": "ZERO", "1": "ONE", "2": "TWO", "3": "THREE", "4": "FOUR",
-                "5": "FIVE", "6": "SIX", "7": "SEVEN", "8": "EIGHT", "9": "NINE"}
-    return "".join(num_dict[digit] for digit in num_str)
-
-def prepare_text_for_playfair(text):
-    text = text.upper().replace("J", "I").replace(" ", "")
-    result = ""
-    i = 0
-    while i < len(text):
-        char = text[i]
-        if char.isdigit():
-            num = ""
-            while i < len(text) and text[i].isdigit():
-                num += text[i]
-                i += 1
-            result += number_to_text(num)
-        else:
-            result += char
-            i += 1
-    return result
-
-def create_matrix(key, size=5):
-    key = key.upper().replace("J", "I")
-    chars = [chr(i) for i in range(65, 91)]  # A-Z
-    if size == 6:
-        chars.append("0")  # Optional: for 6x6
-    seen = set()
-    matrix = []
-    for c in key + ''.join(chars):
-        if c not in seen and c.isalpha():
-            seen.add(c)
-            matrix.append(c)
-    return [matrix[i:i+size] for i in range(0, size*size, size)]
-
-def find_pos(matrix, char):
-    for i, row in enumerate(matrix):
-        for j, c in enumerate(row):
-            if c == char:
-                return i, j
-    return None, None
-
-def prepare_text(text):
-    text = prepare_text_for_playfair(text)
-    i = 0
-    pairs = []
-    while i < len(text):
-        a = text[i]
-        b = text[i+1] if i+1 < len(text) else 'X'
-        if a == b:
-            pairs.append((a, 'X'))
-            i += 1
-        else:
-            pairs.append((a, b))
-            i += 2
-    return pairs
-
-def playfair_encrypt(text, matrix, size=5):
-    result = ""
-    for a, b in prepare_text(text):
-        r1, c1 = find_pos(matrix, a)
-        r2, c2 = find_pos(matrix, b)
-        if r1 == r2:
-            result += matrix[r1][(c1+1)%size] + matrix[r2][(c2+1)%size]
-        elif c1 == c2:
-            result += matrix[(r1+1)%size][c1] + matrix[(r2+1)%size][c2]
-        else:
-            result += matrix[r1][c2] + matrix[r2][c1]
-    return result
-
-def playfair_decrypt(text, matrix, size=5):
-    result = ""
-    pairs = [(text[i], text[i+1]) for i in range(0, len(text), 2)]
-    for a, b in pairs:
-        r1, c1 = find_pos(matrix, a)
-        r2, c2 = find_pos(matrix, b)
-        if r1 == r2:
-            result += matrix[r1][(c1-1)%size] + matrix[r2][(c2-1)%size]
-        elif c1 == c2:
-            result += matrix[(r1-1)%size][c1] + matrix[(r2-1)%size][c2]
-        else:
-            result += matrix[r1][c2] + matrix[r2][c1]
-    return result
+from playfair_core import IncrementalPlayfair, alphabet_for, get_cipher, playfair_process_file
+from result_view import PagedText
 
 # ==== Giao diện Playfair ====
 def open_playfair_window():
     pf = tk.Toplevel()
     pf.title("PLAYFAIR")
     pf.geometry("800x400")
+    # Chế độ LIVE: trạng thái mã hóa tăng dần + lịch after() đang chờ (debounce)
+    LIVE_DELAY_MS = 150
+    live = {"inc": None, "params": None, "job": None}
 
     def load_file():
         file = filedialog.askopenfilename()
@@ -103,39 +24,89 @@ def open_playfair_window():
     def export_file():
         file = filedialog.asksaveasfilename(defaultextension=".txt")
         if file:
-            with open(file, 'w') as f:
-                f.write(result_box.get('1.0', tk.END).strip())
+            result_box.export(file)
             messagebox.showinfo("Done", "File exported successfully.")
 
+    def process_file(decrypt):
+        src = filedialog.askopenfilename()
+        if not src:
+            return
+        dst = filedialog.asksaveasfilename(defaultextension=".txt")
+        if not dst:
+            return
+        size = 6 if var.get() == 2 else 5
+        cipher = get_cipher(key_entry.get(), size)
+        try:
+            playfair_process_file(src, dst, cipher, decrypt)
+        except (KeyError, ValueError) as ex:
+            messagebox.showerror("Error", f"Invalid input: {ex}")
+            return
+        messagebox.showinfo("Done", "File processed successfully.")
+
     def init_matrix():
         key = key_entry.get()
         size = 6 if var.get() == 2 else 5
-        mat = create_matrix(key, size)
+        mat = get_cipher(key, size).matrix
         msg = "\n".join([' '.join(row) for row in mat])
         messagebox.showinfo("Matrix", msg)
 
     def encrypt():
         key = key_entry.get()
-        msg = msg_text.get('1.0', tk.END).strip()
+        msg = msg_text.get('1.0', 'end-1c')
         size = 6 if var.get() == 2 else 5
-        matrix = create_matrix(key, size)
-        encrypted = playfair_encrypt(msg, matrix, size)
-        result_box.delete('1.0', tk.END)
-        result_box.insert(tk.END, encrypted)
+        cipher = get_cipher(key, size)
+        encrypted = cipher.encrypt(msg)
+        live["inc"] = None
+        result_box.set(encrypted)
 
     def decrypt():
         key = key_entry.get()
         msg = msg_text.get('1.0', tk.END).strip()
         size = 6 if var.get() == 2 else 5
-        matrix = create_matrix(key, size)
-        decrypted = playfair_decrypt(msg, matrix, size)
-        result_box.delete('1.0', tk.END)
-        result_box.insert(tk.END, decrypted)
+        cipher = get_cipher(key, size)
+        decrypted = cipher.decrypt(msg)
+        live["inc"] = None
+        result_box.set(decrypted)
 
     def clear():
         msg_text.delete('1.0', tk.END)
         key_entry.delete(0, tk.END)
-        result_box.delete('1.0', tk.END)
+        result_box.clear()
+        live["inc"] = None
+
+    def live_update():
+        live["job"] = None
+        if not live_var.get():
+            return
+        size = 6 if var.get() == 2 else 5
+        params = (key_entry.get(), size)
+        if live["inc"] is None or live["params"] != params:
+            # Khóa/kích thước đổi hoặc ô kết quả bị ghi bởi nút khác: dựng lại từ đầu
+            live["inc"] = IncrementalPlayfair(get_cipher(*params))
+            live["params"] = params
+            result_box.clear()
+        try:
+            start, end, text = live["inc"].update(msg_text.get('1.0', 'end-1c'))
+        except KeyError as ex:
+            live["inc"] = None
+            live_status.config(text=f"Invalid character: {ex}")
+            return
+        live_status.config(text="")
+        # Chỉ vá đoạn bản mã thay đổi, không xóa/chèn lại toàn bộ
+        if end > start or text:
+            result_box.patch(start, end, text)
+
+    def schedule_live(event=None):
+        # <<Modified>> chỉ bắn lại sau khi cờ modified được xóa
+        msg_text.edit_modified(False)
+        if live["job"] is not None:
+            pf.after_cancel(live["job"])
+        live["job"] = pf.after(LIVE_DELAY_MS, live_update)
+
+    def toggle_live():
+        live["inc"] = None
+        if live_var.get():
+            schedule_live()
 
     # Layout
     left = tk.Frame(pf)
@@ -144,6 +115,7 @@ def open_playfair_window():
     tk.Label(left, text="MESSAGE:").pack()
     msg_text = scrolledtext.ScrolledText(left, height=5, width=40)
     msg_text.pack()
+    msg_text.bind("<<Modified>>", schedule_live)
 
     frame_key = tk.Frame(left)
     frame_key.pack(pady=5)
@@ -155,22 +127,37 @@ def open_playfair_window():
     # Matrix buttons
     matrix_btns = tk.Frame(left)
     matrix_btns.pack(pady=10)
-    for i, c in enumerate("ABCDEFGHIKLMNOPQRSTUVWXYZ"):
-        tk.Button(matrix_btns, text=c, width=2).grid(row=i//5, column=i%5)
+
+    def draw_alphabet(*args):
+        size = 6 if var.get() == 2 else 5
+        for widget in matrix_btns.winfo_children():
+            widget.destroy()
+        for i, c in enumerate(alphabet_for(size)):
+            tk.Button(matrix_btns, text=c, width=2).grid(row=i//size, column=i%size)
 
     var = tk.IntVar(value=1)
+    draw_alphabet()
+    var.trace_add("write", draw_alphabet)
     matrix_type = tk.Frame(left)
     matrix_type.pack()
     tk.Radiobutton(matrix_type, text="5x5 Matrix", variable=var, value=1).pack(anchor=tk.W)
     tk.Radiobutton(matrix_type, text="6x6 Matrix", variable=var, value=2).pack(anchor=tk.W)
     tk.Button(left, text="INITIAL MATRIX", command=init_matrix).pack(pady=5)
 
+    live_var = tk.IntVar(value=0)
+    tk.Checkbutton(left, text="LIVE ENCRYPT", variable=live_var, command=toggle_live).pack()
+    live_status = tk.Label(left, text="", fg="red")
+    live_status.pack()
+    # Đổi khóa hoặc kích thước ma trận khi đang LIVE cũng mã hóa lại
+    key_entry.bind("<KeyRelease>", lambda e: schedule_live() if live_var.get() else None)
+    var.trace_add("write", lambda *a: schedule_live() if live_var.get() else None)
+
     # Right side
     right = tk.Frame(pf)
     right.pack(side=tk.RIGHT, padx=10, pady=10, fill=tk.BOTH, expand=True)
 
     tk.Label(right, text="RESULT:").pack()
-    result_box = scrolledtext.ScrolledText(right, height=10)
+    result_box = PagedText(right, height=10)
     result_box.pack(fill=tk.BOTH, expand=True)
 
     btns = tk.Frame(right)
@@ -178,4 +165,6 @@ def open_playfair_window():
     tk.Button(btns, text="ENCRYPT", command=encrypt).pack(side=tk.LEFT, padx=5)
     tk.Button(btns, text="DECRYPT", command=decrypt).pack(side=tk.LEFT, padx=5)
     tk.Button(btns, text="EXPORT FILE", command=export_file).pack(side=tk.LEFT, padx=5)
+    tk.Button(btns, text="ENCRYPT FILE", command=lambda: process_file(False)).pack(side=tk.LEFT, padx=5)
+    tk.Button(btns, text="DECRYPT FILE", command=lambda: process_file(True)).pack(side=tk.LEFT, padx=5)
     tk.Button(btns, text="CLEAR", command=clear).pack(side=tk.LEFT, padx=5)
\ No newline at end of file
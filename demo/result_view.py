@@ -0,0 +1,241 @@
+import tkinter as tk
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from operator import add
+
+from instrument import timed
+
+# ==== Khung kết quả phân trang (ảo hóa) ====
+# Toàn bộ kết quả nằm trong bộ đệm (chuỗi Python); widget Text chỉ giữ một cửa sổ tối đa
+# WINDOW_ROWS dòng. Dòng logic dài (bản mã thường chỉ là một dòng) được chia thành các dòng
+# width ký tự chỉ để đếm/định vị cửa sổ; widget giữ đúng một lát cắt liên tục của bộ đệm
+# (không chèn thêm '\n') và tự xuống dòng (wrap="char"), nên sao chép ra là bản mã nguyên vẹn.
+# Cuộn gần tới mép cửa sổ thì nạp thêm CHUNK_ROWS dòng và bỏ bớt ở đầu kia;
+# khi hiện kết quả mới, các đoạn sau đoạn đầu tiên được chèn dần bằng after().
+# Xuất file / lấy nội dung luôn đọc từ bộ đệm, không đọc lại widget.
+
+WINDOW_ROWS = 400
+CHUNK_ROWS = 100
+EDGE = 0.15  # phần cửa sổ còn lại phía trước thì bắt đầu nạp thêm
+
+def index_rows(text, width):
+    # Trả về (starts, ends): vị trí đầu/cuối trong text của từng dòng hiển thị.
+    # Dòng ngắn tính gộp bằng accumulate; chỉ dòng dài hơn width mới phải cắt từng đoạn.
+    lengths = list(map(len, text.split('\n')))
+    line_starts = [0, *accumulate([n + 1 for n in lengths[:-1]])]
+    starts, ends, prev = [], [], 0
+    for i in [i for i, n in enumerate(lengths) if n > width]:
+        starts.extend(line_starts[prev:i])
+        ends.extend(map(add, line_starts[prev:i], lengths[prev:i]))
+        line_start, line_end = line_starts[i], line_starts[i] + lengths[i]
+        row_starts = range(line_start, line_end, width)
+        starts.extend(row_starts)
+        ends.extend([min(s + width, line_end) for s in row_starts])
+        prev = i + 1
+    starts.extend(line_starts[prev:])
+    ends.extend(map(add, line_starts[prev:], lengths[prev:]))
+    return starts, ends
+
+class PagedText(tk.Frame):
+    def __init__(self, master, height=10, width=80, **kwargs):
+        super().__init__(master, **kwargs)
+        self.text = tk.Text(self, height=height, width=width, wrap="char", state="disabled")
+        self.scroll = tk.Scrollbar(self, command=self._on_scrollbar)
+        self.scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.text.config(yscrollcommand=self._on_text_scroll)
+        self.text.bind("<<Copy>>", self._copy)
+        self.row_width = width
+        self.buffer = ""
+        self.starts, self.ends = index_rows("", width)
+        self.first = self.last = 0  # cửa sổ hiện tại: các dòng [first, last)
+        self.jobs = []
+
+    # ==== API cho cửa sổ gọi ====
+    @timed("render", lambda args, out: (1, len(args[1])))
+    def set(self, text):
+        self.buffer = text
+        self.starts, self.ends = index_rows(text, self.row_width)
+        self._render(0)
+
+    def get(self):
+        return self.buffer
+
+    def clear(self):
+        self.set("")
+
+    @timed("render", lambda args, out: (1, len(args[3])))
+    def patch(self, start, end, text):
+        # Thay buffer[start:end] bằng text (chế độ LIVE). Sửa trong cửa sổ đang hiện thì vá thẳng
+        # vào widget; sửa tràn qua mép cuối cửa sổ thì nạp lại phần từ điểm sửa tới hết cửa sổ
+        # (giữ số dòng); sửa sau cửa sổ không đụng tới widget; chỉ sửa ở trước cửa sổ mới dựng lại.
+        win_start, win_end = self._window_span()
+        top_row = self._top_row()
+        self.buffer = self.buffer[:start] + text + self.buffer[end:]
+        self._reindex_from(start)
+        if start < win_start or self.first >= len(self.starts) or self.starts[self.first] != win_start:
+            self._render(top_row)
+            return
+        if start > win_end:
+            self._update_scrollbar()
+            return
+        if end <= win_end and win_end - win_start + len(text) - (end - start) > 2 * WINDOW_ROWS * self.row_width:
+            # Đoạn chèn làm cửa sổ phình quá lớn
+            self._render(top_row)
+            return
+        self.text.config(state="normal")
+        if end > win_end:
+            self.last = min(len(self.starts), max(self.last, bisect_right(self.starts, start)))
+            self.text.delete(self._widget_index(start - win_start), tk.END)
+            self.text.insert(tk.END, self.buffer[start:self.ends[self.last - 1]])
+        else:
+            self.text.delete(self._widget_index(start - win_start), self._widget_index(end - win_start))
+            self.text.insert(self._widget_index(start - win_start), text)
+            # Kéo mép cuối cửa sổ tới ranh giới dòng gần nhất
+            new_end = win_end + len(text) - (end - start)
+            self.last = max(self.first + 1, bisect_left(self.ends, new_end) + 1)
+            self.last = min(self.last, len(self.starts))
+            self.text.insert(tk.END, self.buffer[new_end:self.ends[self.last - 1]])
+        self.text.config(state="disabled")
+        self._update_scrollbar()
+
+    def export(self, path):
+        with open(path, 'w') as f:
+            f.write(self.buffer)
+
+    # ==== Nạp dòng vào widget ====
+    def _reindex_from(self, pos):
+        # Các dòng nằm trước dòng logic chứa pos không đổi; chỉ tính lại từ đó tới hết bộ đệm
+        line_start = self.buffer.rfind('\n', 0, pos) + 1
+        row = bisect_left(self.starts, line_start)
+        starts, ends = index_rows(self.buffer[line_start:], self.row_width)
+        self.starts[row:] = [s + line_start for s in starts]
+        self.ends[row:] = [e + line_start for e in ends]
+
+    def _window_span(self):
+        # Lát cắt của bộ đệm đang nằm trong widget
+        if self.last == self.first:
+            return self.starts[self.first], self.starts[self.first]
+        return self.starts[self.first], self.ends[self.last - 1]
+
+    @staticmethod
+    def _widget_index(offset):
+        return f"1.0 + {offset} chars"
+
+    def _top_offset(self):
+        # Vị trí trong bộ đệm của ký tự ở góc trên bên trái khung nhìn
+        return self.starts[self.first] + (self.text.count("1.0", "@0,0", "chars") or (0,))[0]
+
+    def _top_row(self):
+        return bisect_right(self.starts, self._top_offset()) - 1
+
+    def _view_row(self, row):
+        self.text.yview(self._widget_index(self.starts[row] - self.starts[self.first]))
+
+    def _copy(self, event=None):
+        # Sao chép lấy từ bộ đệm; vùng chọn chạm mép cửa sổ thì kéo dài tới đầu/cuối bộ đệm
+        # (Ctrl+A rồi sao chép được toàn bộ kết quả chứ không chỉ phần đang nạp)
+        try:
+            sel_start = self.text.count("1.0", "sel.first", "chars")
+            sel_end = self.text.count("1.0", "sel.last", "chars")
+        except tk.TclError:
+            return "break"
+        win_start, win_end = self._window_span()
+        start = win_start + (sel_start or (0,))[0]
+        end = win_start + (sel_end or (0,))[0]
+        if start == win_start:
+            start = 0
+        if end >= win_end:
+            end = len(self.buffer)
+        self.clipboard_clear()
+        self.clipboard_append(self.buffer[start:end])
+        return "break"
+
+    def _cancel(self):
+        for job in self.jobs:
+            self.after_cancel(job)
+        self.jobs = []
+
+    def _render(self, top, view_row=None):
+        self._cancel()
+        total = len(self.starts)
+        self.first = self.last = max(0, min(top, total - 1))
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.config(state="disabled")
+        self._load_chunk(min(total, self.first + WINDOW_ROWS), view_row)
+
+    @timed("render")
+    def _load_chunk(self, stop, view_row):
+        # Đoạn đầu chèn ngay (phần đang nhìn thấy), các đoạn sau chờ after() lần lượt
+        if self.jobs:
+            self.jobs.pop(0)
+        stop = min(stop, len(self.starts))
+        end = min(stop, self.last + CHUNK_ROWS)
+        if end > self.last:
+            self.text.config(state="normal")
+            self.text.insert(tk.END, self.buffer[self._window_span()[1]:self.ends[end - 1]])
+            self.text.config(state="disabled")
+            self.last = end
+        if view_row is not None and view_row < self.last:
+            self._view_row(view_row)
+            view_row = None
+        if self.last < stop:
+            self.jobs.append(self.after(1, self._load_chunk, stop, view_row))
+        self._update_scrollbar()
+
+    @timed("render")
+    def _shift(self, forward):
+        # Nạp thêm một đoạn ở mép đang cuộn tới, bỏ bớt ở mép kia, giữ nguyên ký tự đang ở đầu khung nhìn
+        self.jobs = []
+        total = len(self.starts)
+        top = self._top_offset()
+        self.text.config(state="normal")
+        if forward:
+            stop = min(total, self.last + CHUNK_ROWS)
+            self.text.insert(tk.END, self.buffer[self.ends[self.last - 1]:self.ends[stop - 1]])
+            self.last = stop
+            drop = max(0, self.last - self.first - WINDOW_ROWS)
+            if drop:
+                self.text.delete("1.0", self._widget_index(self.starts[self.first + drop] - self.starts[self.first]))
+                self.first += drop
+        else:
+            start = max(0, self.first - CHUNK_ROWS)
+            self.text.insert("1.0", self.buffer[self.starts[start]:self.starts[self.first]])
+            self.first = start
+            drop = max(0, self.last - self.first - WINDOW_ROWS)
+            if drop:
+                self.last -= drop
+                self.text.delete(self._widget_index(self.ends[self.last - 1] - self.starts[self.first]), tk.END)
+        self.text.config(state="disabled")
+        self.text.yview(self._widget_index(top - self.starts[self.first]))
+
+    # ==== Thanh cuộn theo toàn bộ bộ đệm ====
+    def _update_scrollbar(self):
+        lo, hi = self.text.yview()
+        self._on_text_scroll(lo, hi)
+
+    def _on_text_scroll(self, lo, hi):
+        lo, hi = float(lo), float(hi)
+        total = len(self.starts)
+        rows = max(self.last - self.first, 1)
+        self.scroll.set((self.first + lo * rows) / total, (self.first + hi * rows) / total)
+        if self.jobs:
+            return
+        if hi > 1 - EDGE and self.last < total:
+            self.jobs.append(self.after_idle(self._shift, True))
+        elif lo < EDGE and self.first > 0:
+            self.jobs.append(self.after_idle(self._shift, False))
+
+    def _on_scrollbar(self, *args):
+        if args[0] != "moveto":
+            self.text.yview_scroll(int(args[1]), args[2])
+            return
+        total = len(self.starts)
+        target = max(0, min(int(float(args[1]) * total), total - 1))
+        visible = int(self.text.cget("height"))
+        if self.first <= target and target + visible <= self.last:
+            self._view_row(target)
+        else:
+            # Nhảy xa: dựng lại cửa sổ bắt đầu từ dòng đích
+            self._render(target)
@@ -0,0 +1,380 @@
+import random
+from math import gcd
+import base64
+import os
+import secrets
+import struct
+from collections import OrderedDict
+
+from instrument import count, timed
+
+# ====================
+# RSA core functions
+# ====================
+def is_prime(n):
+    if n <= 1:
+        return False
+    if n <= 3:
+        return True
+    if n % 2 == 0 or n % 3 == 0:
+        return False
+    for i in range(5, int(n**0.5) + 1, 6):
+        if n % i == 0 or n % (i + 2) == 0:
+            return False
+    return True
+
+# ====================
+# Sinh số nguyên tố lớn (Miller-Rabin + sàng số nguyên tố nhỏ)
+# ====================
+KEY_SIZES = [1024, 2048, 4096]
+MR_ROUNDS = 40
+SMALL_PRIMES = [p for p in range(3, 2000) if is_prime(p)]
+SMALL_PRIMORIAL = 1
+for _p in SMALL_PRIMES:
+    SMALL_PRIMORIAL *= _p
+del _p
+
+def miller_rabin(n, rounds=MR_ROUNDS):
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for _ in range(rounds):
+        a = secrets.randbelow(n - 3) + 2
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+def is_probable_prime(n):
+    if n < 2000:
+        return is_prime(n)
+    # Sàng: gcd với tích các số nguyên tố nhỏ loại phần lớn hợp số chỉ bằng 1 phép tính
+    if gcd(n, SMALL_PRIMORIAL) != 1:
+        return False
+    return miller_rabin(n)
+
+def search_prime(bits, attempts=200):
+    # Chạy trong tiến trình con; trả về None nếu hết lượt thử để tiến trình cha giao lô mới
+    for _ in range(attempts):
+        # Bật 2 bit cao nhất để p*q có đúng 2*bits bit, bit thấp nhất để là số lẻ
+        candidate = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+        if is_probable_prime(candidate):
+            return candidate
+    return None
+
+def generate_primes(bits, count=2, workers=None, cancel=None, pool=None, leftover=None):
+    # cancel: threading.Event tùy chọn, kiểm tra giữa các lô để có thể hủy
+    # pool: ProcessPoolExecutor có sẵn để dùng lại (không tốn khởi động tiến trình, không bị đóng);
+    # leftover (tùy chọn) nhận các lần tìm còn đang chạy trong pool đó khi đã đủ số nguyên tố
+    workers = workers or os.cpu_count() or 1
+    primes = []
+    if workers == 1:
+        while len(primes) < count:
+            if cancel is not None and cancel.is_set():
+                return None
+            p = search_prime(bits)
+            if p and p not in primes:
+                primes.append(p)
+        return primes
+    # Import muộn: concurrent.futures tốn ~20 ms, chỉ cần khi sinh khóa lớn
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    own_pool = pool is None
+    pending = set()
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        pending = {pool.submit(search_prime, bits) for _ in range(workers)}
+        while len(primes) < count:
+            if cancel is not None and cancel.is_set():
+                return None
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for f in done:
+                p = f.result()
+                if p and p not in primes and len(primes) < count:
+                    primes.append(p)
+                pending.add(pool.submit(search_prime, bits))
+        return primes
+    finally:
+        if own_pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+        else:
+            for f in pending:
+                f.cancel()
+            if leftover is not None:
+                leftover.extend(f for f in pending if not f.cancelled())
+
+def generate_large_primes(key_bits, cancel=None, pool=None, leftover=None):
+    # Chọn p, q sao cho e = 65537 nguyên tố cùng nhau với phi; trả về None nếu bị hủy
+    while True:
+        primes = generate_primes(key_bits // 2, cancel=cancel, pool=pool, leftover=leftover)
+        if primes is None:
+            return None
+        p, q = primes
+        if gcd(65537, (p - 1) * (q - 1)) == 1:
+            return p, q
+
+def generate_keys(p, q):
+    n = p * q
+    phi = (p - 1)*(q - 1)
+
+    e = 65537
+    while gcd(e, phi) != 1:
+        e = random.randrange(2, phi)
+
+    # Find d (modular inverse)
+    def modinv(a, m):
+        m0, x0, x1 = m, 0, 1
+        while a > 1:
+            q = a // m
+            a, m = m, a % m
+            x0, x1 = x1 - q * x0, x0
+        return x1 + m0 if x1 < 0 else x1
+
+    d = modinv(e, phi)
+    return (e, d, n, phi)
+
+def crt_params(p, q, d):
+    # Tham số CRT (dP, dQ, qInv) để giải mã theo định lý số dư Trung Hoa
+    return (p, q, d % (p - 1), d % (q - 1), pow(q, -1, p))
+
+def make_decryptor(d, n, crt=None):
+    if crt is None:
+        return lambda num: pow(num, d, n)
+    p, q, dp, dq, q_inv = crt
+    def decrypt_num(num):
+        m1 = pow(num, dp, p)
+        m2 = pow(num, dq, q)
+        return m2 + (q_inv * (m1 - m2) % p) * q
+    return decrypt_num
+
+# ====================
+# Codebook: ghi nhớ kết quả pow theo từng khóa cho chế độ từng ký tự
+# ====================
+class RSACodebook:
+    # books: (số mũ, n) -> {số vào: số ra}, giữ tối đa max_keys khóa theo LRU
+    def __init__(self, max_keys=16, max_entries=65536):
+        self.max_keys = max_keys
+        self.max_entries = max_entries
+        self.books = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _book(self, exp, n):
+        key = (exp, n)
+        book = self.books.get(key)
+        if book is None:
+            book = self.books[key] = {}
+            if len(self.books) > self.max_keys:
+                self.books.popitem(last=False)
+        else:
+            self.books.move_to_end(key)
+        return book
+
+    @timed("modexp", lambda args, out: (len(out), 0))
+    def apply(self, nums, exp, n, modexp=None):
+        # Mỗi giá trị khác nhau chỉ tính pow một lần
+        book = self._book(exp, n)
+        missing = set(nums).difference(book)
+        modexp = modexp or (lambda x: pow(x, exp, n))
+        computed = {x: modexp(x) for x in missing}
+        if len(book) + len(computed) <= self.max_entries:
+            book.update(computed)
+            table = book
+        else:
+            table = {**book, **computed}
+        self.misses += len(missing)
+        self.hits += len(nums) - len(missing)
+        count("pow", len(missing))
+        return [table[x] for x in nums]
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "keys": len(self.books),
+        }
+
+    def clear(self):
+        self.books.clear()
+        self.hits = self.misses = 0
+
+CODEBOOK = RSACodebook()
+
+# Chế độ mã hóa: "char" = mỗi ký tự một lần pow (dùng để minh họa),
+# "block" = gói nhiều byte UTF-8 vào một số nguyên nhỏ hơn n
+BLOCK_MARKER = "B"
+
+# Định dạng nhị phân: header + các số nguyên big-endian cùng độ rộng (= số byte của n)
+# header: magic, version, mode (0 = char, 1 = block), độ rộng, độ dài gốc
+BINARY_MAGIC = b"RSAB"
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct(">4sBBHQ")
+MODE_CODES = {"char": 0, "block": 1}
+
+def rsa_block_size(n):
+    # Số byte lớn nhất sao cho mọi khối đều < n
+    return (n.bit_length() - 1) // 8
+
+@timed("modexp", lambda args, out: (len(out), len(args[0])))
+def encrypt_block_numbers(data, e, n):
+    k = rsa_block_size(n)
+    if k < 1:
+        raise ValueError("n is too small for block mode (need n > 256)")
+    padded = data + b'\0' * (-len(data) % k)
+    count("pow", len(padded) // k)
+    return [pow(int.from_bytes(padded[i:i+k], 'big'), e, n) for i in range(0, len(padded), k)]
+
+@timed("modexp", lambda args, out: (len(args[0]), len(out)))
+def decrypt_block_numbers(cipher_numbers, length, decrypt_num, n):
+    count("pow", len(cipher_numbers))
+    k = rsa_block_size(n)
+    return b''.join([decrypt_num(num).to_bytes(k, 'big') for num in cipher_numbers])[:length]
+
+def rsa_encrypt_numbers(msg, e, n, mode="char"):
+    # Trả về (độ dài gốc, danh sách số đã mã hóa)
+    if mode != "block":
+        return len(msg), CODEBOOK.apply([ord(ch) for ch in msg], e, n)
+    data = msg.encode('utf-8')
+    return len(data), encrypt_block_numbers(data, e, n)
+
+def pack_ciphertext(mode, length, cipher_numbers, n):
+    width = (n.bit_length() + 7) // 8
+    header = BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, MODE_CODES[mode], width, length)
+    return header + b''.join([num.to_bytes(width, 'big') for num in cipher_numbers])
+
+@timed("encode", lambda args, out: (1, len(out)))
+def rsa_encrypt(msg, e, n, mode="char", fmt="text", armor=True):
+    length, cipher_numbers = rsa_encrypt_numbers(msg, e, n, mode)
+    if fmt == "binary":
+        packed = pack_ciphertext(mode, length, cipher_numbers, n)
+        return base64.b64encode(packed).decode('utf-8') if armor else packed
+    fields = list(map(str, cipher_numbers))
+    if mode == "block":
+        # Khung: "B <độ dài byte gốc> c1 c2 ..." để bỏ phần đệm khi giải mã
+        fields = [BLOCK_MARKER, str(length)] + fields
+    cipher_bytes = ' '.join(fields).encode('utf-8')
+    return base64.b64encode(cipher_bytes).decode('utf-8')
+
+def rsa_decrypt_blocks(fields, decrypt_num, n):
+    numbers = [int(num) for num in fields[1:]]
+    return decrypt_block_numbers(numbers, int(fields[0]), decrypt_num, n).decode('utf-8')
+
+def unpack_ciphertext(data):
+    # Trả về (mode, độ dài gốc, danh sách số) từ bản mã nhị phân
+    view = memoryview(data)
+    magic, version, mode, width, length = BINARY_HEADER.unpack_from(view)
+    if version != BINARY_VERSION:
+        raise ValueError(f"Unsupported ciphertext version {version}")
+    body = view[BINARY_HEADER.size:]
+    if len(body) % width:
+        raise ValueError("Truncated ciphertext")
+    from_bytes = int.from_bytes
+    return mode, length, [from_bytes(body[i:i+width], 'big') for i in range(0, len(body), width)]
+
+def check_record_length(mode, length, cipher_numbers, n):
+    # Số khối phải khớp độ dài gốc trong header: bắt được bản mã bị cắt hoặc nhiều bản mã dính liền
+    expected = -(-length // rsa_block_size(n)) if mode == MODE_CODES["block"] else length
+    if len(cipher_numbers) != expected:
+        raise ValueError("Ciphertext length does not match its header")
+
+def decode_armor(text):
+    # Bỏ khoảng trắng/xuống dòng (base64 bị ngắt dòng khi sao chép) rồi giải mã chặt:
+    # ký tự lạ hoặc dữ liệu sau dấu '=' (nhiều bản mã ghép lại) đều báo lỗi
+    return base64.b64decode(''.join(text.split()), validate=True)
+
+def rsa_decrypt_binary(data, d, n, decrypt_num):
+    mode, length, cipher_numbers = unpack_ciphertext(data)
+    check_record_length(mode, length, cipher_numbers, n)
+    if mode == MODE_CODES["block"]:
+        return decrypt_block_numbers(cipher_numbers, length, decrypt_num, n).decode('utf-8')
+    return ''.join(map(chr, CODEBOOK.apply(cipher_numbers, d, n, decrypt_num)))
+
+# Bản mã nhị phân chế độ block cho dữ liệu bytes tùy ý (file). Mỗi bản mã tự
+# mang độ dài nên có thể ghi nối tiếp nhiều bản mã vào cùng một file.
+@timed("encode", lambda args, out: (1, len(args[0])))
+def rsa_encrypt_bytes(data, e, n):
+    return pack_ciphertext("block", len(data), encrypt_block_numbers(data, e, n), n)
+
+@timed("encode", lambda args, out: (1, len(out)))
+def rsa_decrypt_bytes(record, d, n, crt=None):
+    mode, length, cipher_numbers = unpack_ciphertext(record)
+    if mode != MODE_CODES["block"]:
+        raise ValueError("Expected block-mode ciphertext")
+    check_record_length(mode, length, cipher_numbers, n)
+    return decrypt_block_numbers(cipher_numbers, length, make_decryptor(d, n, crt), n)
+
+def record_body_size(header, n):
+    # Số byte phần thân của một bản mã block, tính từ header
+    _, _, _, width, length = BINARY_HEADER.unpack(header)
+    k = rsa_block_size(n)
+    return -(-length // k) * width
+
+@timed("encode", lambda args, out: (1, len(args[0])))
+def rsa_decrypt_strict(cipher, d, n, crt=None):
+    # Như rsa_decrypt nhưng ném lỗi thay vì trả về "Invalid ciphertext"
+    # Nhận cả định dạng nhị phân (bytes hoặc base64) lẫn định dạng chuỗi số cũ
+    decrypt_num = make_decryptor(d, n, crt)
+    if isinstance(cipher, (bytes, bytearray, memoryview)):
+        data = cipher
+    else:
+        data = decode_armor(cipher)
+    if data[:len(BINARY_MAGIC)] == BINARY_MAGIC:
+        return rsa_decrypt_binary(data, d, n, decrypt_num)
+    decoded = bytes(data).decode('utf-8')
+    fields = decoded.strip().split()
+    if fields and fields[0] == BLOCK_MARKER:
+        return rsa_decrypt_blocks(fields[1:], decrypt_num, n)
+    # Tra codebook theo chuỗi số để bỏ qua cả bước int() với các số lặp lại
+    return ''.join(map(chr, CODEBOOK.apply(fields, d, n, lambda num: decrypt_num(int(num)))))
+
+def rsa_decrypt(cipher, d, n, crt=None):
+    try:
+        return rsa_decrypt_strict(cipher, d, n, crt)
+    except Exception:
+        return "Invalid ciphertext"
+
+# ====================
+# Giải mã hàng loạt trên nhiều tiến trình
+# ====================
+BULK_CHUNK_SIZE = 64
+
+def decrypt_chunk(ciphers, d, n, crt=None):
+    # Kết quả từng phần tử: (bản rõ, None) hoặc (None, "Loại lỗi: chi tiết")
+    results = []
+    for cipher in ciphers:
+        try:
+            results.append((rsa_decrypt_strict(cipher, d, n, crt), None))
+        except Exception as ex:
+            results.append((None, f"{type(ex).__name__}: {ex}"))
+    return results
+
+def encrypt_chunk(messages, e, n, mode="char", fmt="text"):
+    # Như decrypt_chunk nhưng cho chiều mã hóa
+    results = []
+    for msg in messages:
+        try:
+            results.append((rsa_encrypt(msg, e, n, mode, fmt), None))
+        except Exception as ex:
+            results.append((None, f"{type(ex).__name__}: {ex}"))
+    return results
+
+def rsa_decrypt_bulk(ciphers, d, n, crt=None, chunk_size=BULK_CHUNK_SIZE, workers=None):
+    # Chia danh sách bản mã thành các chunk, giải mã song song, giữ nguyên thứ tự đầu vào
+    ciphers = list(ciphers)
+    workers = workers or os.cpu_count() or 1
+    chunks = [ciphers[i:i+chunk_size] for i in range(0, len(ciphers), chunk_size)]
+    if workers == 1 or len(chunks) <= 1:
+        return [r for chunk in chunks for r in decrypt_chunk(chunk, d, n, crt)]
+    from concurrent.futures import ProcessPoolExecutor
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        parts = pool.map(decrypt_chunk, chunks, [d] * len(chunks), [n] * len(chunks), [crt] * len(chunks))
+        return [r for part in parts for r in part]
@@ -1,56 +1,10 @@
 import tkinter as tk
-from tkinter import messagebox
-import random
-from math import gcd
-import base64
+from tkinter import messagebox, ttk
 import time  # Thêm ở đầu file
-# ====================
-# RSA core functions
-# ====================
-def is_prime(n):
-    if n <= 1:
-        return False
-    if n <= 3:
-        return True
-    if n % 2 == 0 or n % 3 == 0:
-        return False
-    for i in range(5, int(n**0.5) + 1, 6):
-        if n % i == 0 or n % (i + 2) == 0:
-            return False
-    return True
-
-def generate_keys(p, q):
-    n = p * q
-    phi = (p - 1)*(q - 1)
-
-    e = 65537
-    while gcd(e, phi) != 1:
-        e = random.randrange(2, phi)
-
-    # Find d (modular inverse)
-    def modinv(a, m):
-        m0, x0, x1 = m, 0, 1
-        while a > 1:
-            q = a // m
-            a, m = m, a % m
-            x0, x1 = x1 - q * x0, x0
-        return x1 + m0 if x1 < 0 else x1
-
-    d = modinv(e, phi)
-    return (e, d, n, phi)
-
-def rsa_encrypt(msg, e, n):
-    cipher_numbers = [pow(ord(ch), e, n) for ch in msg]
-    cipher_bytes = ' '.join(map(str, cipher_numbers)).encode('utf-8')
-    return base64.b64encode(cipher_bytes).decode('utf-8')
-
-def rsa_decrypt(cipher, d, n):
-    try:
-        decoded = base64.b64decode(cipher.encode('utf-8')).decode('utf-8')
-        cipher_numbers = list(map(int, decoded.strip().split()))
-        return ''.join([chr(pow(num, d, n)) for num in cipher_numbers])
-    except:
-        return "Invalid ciphertext"
+from background import BackgroundRunner, JobCancelled
+from result_view import PagedText
+from rsa_core import (CODEBOOK, KEY_SIZES, crt_params, generate_keys, generate_large_primes,
+                      is_probable_prime, rsa_decrypt, rsa_decrypt_bulk, rsa_decrypt_strict, rsa_encrypt)
 
 # ====================
 # RSA GUI
@@ -81,8 +35,13 @@ def open_rsa_window():
     entry_phi = tk.Entry(key_frame)
     entry_phi.grid(row=2, column=1)
 
-    tk.Label(key_frame, text="1. p and q are two large prime number").grid(row=3, columnspan=2, sticky='w')
-    tk.Label(key_frame, text="2. n = p × q. n is used for public & private keys").grid(row=4, columnspan=2, sticky='w')
+    tk.Label(key_frame, text="Key size").grid(row=3, column=0)
+    key_size_var = tk.IntVar(value=KEY_SIZES[0])
+    tk.OptionMenu(key_frame, key_size_var, *KEY_SIZES).grid(row=3, column=1, sticky='w')
+
+    tk.Label(key_frame, text="1. p and q are two large prime number").grid(row=4, columnspan=2, sticky='w')
+    tk.Label(key_frame, text="2. n = p × q. n is used for public & private keys").grid(row=5, columnspan=2, sticky='w')
+    tk.Label(key_frame, text="3. Leave P, Q blank to generate them for the key size").grid(row=6, columnspan=2, sticky='w')
 
     # Public & Private keys
     pub_frame = tk.LabelFrame(frame_left, text="PUBLIC KEY")
@@ -108,74 +67,157 @@ def open_rsa_window():
     enc_frame.pack(fill=tk.BOTH, expand=True)
     input_encrypt = tk.Text(enc_frame, height=4)
     input_encrypt.pack()
-    output_encrypt = tk.Text(enc_frame, height=4)
+    mode_var = tk.StringVar(value="char")
+    mode_frame = tk.Frame(enc_frame)
+    mode_frame.pack()
+    tk.Radiobutton(mode_frame, text="Per character", variable=mode_var, value="char").pack(side=tk.LEFT)
+    tk.Radiobutton(mode_frame, text="Block", variable=mode_var, value="block").pack(side=tk.LEFT)
+    fmt_var = tk.StringVar(value="binary")
+    tk.Radiobutton(mode_frame, text="Binary", variable=fmt_var, value="binary").pack(side=tk.LEFT, padx=(15, 0))
+    tk.Radiobutton(mode_frame, text="Decimal text", variable=fmt_var, value="text").pack(side=tk.LEFT)
+    output_encrypt = PagedText(enc_frame, height=4)
     output_encrypt.pack()
 
     dec_frame = tk.LabelFrame(frame_right, text="DECRYPT")
     dec_frame.pack(fill=tk.BOTH, expand=True)
     input_decrypt = tk.Text(dec_frame, height=4)
     input_decrypt.pack()
-    output_decrypt = tk.Text(dec_frame, height=4)
+    bulk_var = tk.IntVar(value=0)
+    tk.Checkbutton(dec_frame, text="One ciphertext per line (bulk)", variable=bulk_var).pack()
+    output_decrypt = PagedText(dec_frame, height=4)
     output_decrypt.pack()
+    codebook_label = tk.Label(frame_right, text="")
+    codebook_label.pack()
+
+    def update_codebook_label():
+        st = CODEBOOK.stats()
+        codebook_label.config(text=f"Codebook: {st['hits']} hits / {st['misses']} misses ({st['hit_rate']:.0%})")
 
     def clear_all():
-        for e in [entry_p, entry_q, entry_phi, entry_n, entry_e, entry_d, input_encrypt, output_encrypt, input_decrypt, output_decrypt]:
+        for e in [entry_p, entry_q, entry_phi, entry_n, entry_e, entry_d, input_encrypt, input_decrypt]:
             e.delete(0, tk.END) if isinstance(e, tk.Entry) else e.delete('1.0', tk.END)
+        output_encrypt.clear()
+        output_decrypt.clear()
+
+    runner = BackgroundRunner(root)
+    BULK_MIN_ITEMS = 8
 
     def generate_key():
+        # Sinh khóa chạy ở luồng phụ; chỉ đọc/ghi widget trên luồng Tk
+        if runner.busy:
+            return
+        bits = key_size_var.get()
         try:
             # Auto-generate if blank
             if not entry_p.get() or not entry_q.get():
-                sample_primes = [61, 53, 47, 59, 43, 67]
-                p = random.choice(sample_primes)
-                q = random.choice([x for x in sample_primes if x != p])
-                entry_p.delete(0, tk.END)
-                entry_p.insert(0, str(p))
-                entry_q.delete(0, tk.END)
-                entry_q.insert(0, str(q))
+                p = q = None
             else:
                 p = int(entry_p.get())
                 q = int(entry_q.get())
-
-            if not (is_prime(p) and is_prime(q)):
-                messagebox.showerror("Error", "P and Q must be prime numbers!")
-                return
-
-            e, d, n, phi = generate_keys(p, q)
-            entry_phi.delete(0, tk.END)
-            entry_phi.insert(0, str(phi))
-            entry_n.delete(0, tk.END)
-            entry_n.insert(0, str(n))
-            entry_e.delete(0, tk.END)
-            entry_e.insert(0, str(e))
-            entry_d.delete(0, tk.END)
-            entry_d.insert(0, f"{d}")
         except Exception as ex:
             messagebox.showerror("Error", f"Invalid input: {ex}")
+            return
+
+        def job(progress, cancel):
+            nonlocal p, q
+            if p is None:
+                progress(None, f"Searching {bits}-bit primes...")
+                primes = generate_large_primes(bits, cancel)
+                if primes is None:
+                    raise JobCancelled()
+                p, q = primes
+            if not (is_probable_prime(p) and is_probable_prime(q)):
+                raise ValueError("P and Q must be prime numbers!")
+            return p, q, generate_keys(p, q)
+
+        def done(result):
+            p, q, (e, d, n, phi) = result
+            for entry, value in ((entry_p, p), (entry_q, q), (entry_phi, phi), (entry_n, n), (entry_e, e), (entry_d, d)):
+                entry.delete(0, tk.END)
+                entry.insert(0, str(value))
+
+        def failed(ex):
+            messagebox.showerror("Error", f"Invalid input: {ex}")
+
+        def progress(fraction, text):
+            key_status.config(text=text or "")
+
+        def finish(kind):
+            key_progress.stop()
+            key_status.config(text="Cancelled" if kind == "cancelled" else "")
+            gen_btn.config(state=tk.NORMAL)
+
+        gen_btn.config(state=tk.DISABLED)
+        key_progress.start(10)
+        runner.start(job, done, failed, progress, finish)
 
     def do_encrypt():
         try:
             msg = input_encrypt.get("1.0", tk.END).strip()
             e = int(entry_e.get())
             n = int(entry_n.get())
-            cipher = rsa_encrypt(msg, e, n)
-            output_encrypt.delete('1.0', tk.END)
-            output_encrypt.insert(tk.END, cipher)
+            cipher = rsa_encrypt(msg, e, n, mode_var.get(), fmt_var.get())
+            output_encrypt.set(cipher)
+            update_codebook_label()
         except:
             messagebox.showerror("Error", "Invalid key or message")
 
+    def current_crt(d, n):
+        # Chỉ dùng CRT khi P, Q trên form khớp với n; nếu chỉ nhập (d, n) thì giải mã thường
+        try:
+            p = int(entry_p.get())
+            q = int(entry_q.get())
+        except ValueError:
+            return None
+        if p * q != n or p == q:
+            return None
+        return crt_params(p, q, d)
+
+    def show_decrypted(msg):
+        output_decrypt.set(msg)
+        update_codebook_label()
+
     def do_decrypt():
         try:
             cipher = input_decrypt.get("1.0", tk.END).strip()
             d = int(entry_d.get())
             n = int(entry_n.get())
-            msg = rsa_decrypt(cipher, d, n)
-            output_decrypt.delete('1.0', tk.END)
-            output_decrypt.insert(tk.END, msg)
+            crt = current_crt(d, n)
         except:
             messagebox.showerror("Error", "Invalid key or ciphertext")
-
-    tk.Button(key_frame, text="GENERATE", command=generate_key).grid(row=0, column=2, rowspan=2, padx=5)
+            return
+        bulk = bool(bulk_var.get())
+        lines = [line.strip() for line in cipher.splitlines() if line.strip()]
+        if not bulk and len(lines) < BULK_MIN_ITEMS:
+            show_decrypted(rsa_decrypt(cipher, d, n, crt))
+            return
+        # Nhiều dòng: có thể là một bản mã bị ngắt dòng (base64 76 cột, chép từ khung kết quả)
+        # nên thử giải mã cả khối trước; không được mới coi mỗi dòng là một bản mã và giải mã
+        # song song ở tiến trình con, báo lỗi từng dòng. Chạy ở luồng phụ để không treo giao diện.
+        if runner.busy:
+            return
+
+        def job(progress, cancel):
+            if not bulk:
+                try:
+                    return [(rsa_decrypt_strict(cipher, d, n, crt), None)]
+                except Exception:
+                    pass
+            return rsa_decrypt_bulk(lines, d, n, crt)
+
+        def done(results):
+            out = [msg if err is None else f"[{i + 1}] {err}" for i, (msg, err) in enumerate(results)]
+            show_decrypted("\n".join(out))
+
+        runner.start(job, done, lambda ex: messagebox.showerror("Error", f"Bulk decryption failed: {ex}"))
+
+    gen_btn = tk.Button(key_frame, text="GENERATE", command=generate_key)
+    gen_btn.grid(row=0, column=2, rowspan=2, padx=5)
+    tk.Button(key_frame, text="CANCEL", command=lambda: runner.cancel()).grid(row=2, column=2, padx=5)
+    key_progress = ttk.Progressbar(key_frame, mode="indeterminate", length=150)
+    key_progress.grid(row=7, column=0, columnspan=2, pady=2)
+    key_status = tk.Label(key_frame, text="")
+    key_status.grid(row=8, column=0, columnspan=3, sticky='w')
     tk.Button(frame_left, text="CLEAR", command=clear_all).pack(pady=5)
     tk.Button(enc_frame, text="ENCRYPT", command=do_encrypt).pack()
     tk.Button(dec_frame, text="DECRYPT", command=do_decrypt).pack()
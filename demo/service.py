@@ -0,0 +1,328 @@
+import argparse
+import asyncio
+import itertools
+import json
+import struct
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from playfair_core import get_cipher
+from rsa_core import crt_params, decrypt_chunk, encrypt_chunk, generate_keys, generate_large_primes
+
+# ==== Dịch vụ mã hóa cục bộ (asyncio) ====
+# Giao thức: mỗi khung = 4 byte độ dài (big-endian) + một đối tượng JSON UTF-8.
+#   yêu cầu:  {"id": 1, "op": "playfair_encrypt", "text": "HELLO"}
+#   trả lời:  {"id": 1, "ok": true, "result": "..."}  hoặc  {"id": 1, "ok": false, "error": "..."}
+# Có thể gửi nhiều yêu cầu liên tiếp không chờ (pipelining); trả lời có thể không theo thứ tự, ghép bằng id.
+# Khóa đặt một lần cho mỗi kết nối (playfair_key / rsa_key / rsa_keygen) rồi dùng lại cho các yêu cầu sau.
+# Playfair chạy ngay trên vòng lặp sự kiện; RSA cùng thao tác + cùng khóa (kể cả từ nhiều kết nối)
+# được gom lô trong BATCH_WINDOW_MS hoặc tới MAX_BATCH phần tử rồi gửi sang process pool.
+#   python service.py --port 8765
+#   python service.py --unix /tmp/cipher.sock
+
+FRAME = struct.Struct(">I")
+MAX_FRAME = 16 * 1024 * 1024
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BATCH_WINDOW_MS = 2
+MAX_BATCH = 64
+MIN_KEYGEN_BITS = 64
+
+class ProtocolError(Exception):
+    pass
+
+async def read_frame(reader):
+    # asyncio.IncompleteReadError khi kết nối đóng
+    (length,) = FRAME.unpack(await reader.readexactly(FRAME.size))
+    if length > MAX_FRAME:
+        raise ProtocolError(f"Frame too large ({length} bytes)")
+    return json.loads(await reader.readexactly(length))
+
+def write_frame(writer, obj):
+    data = json.dumps(obj).encode('utf-8')
+    writer.write(FRAME.pack(len(data)) + data)
+
+# ==== Gom lô RSA ====
+class RSABatcher:
+    def __init__(self, pool, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.pool = pool
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.pending = {}  # (hàm, tham số khóa) -> lô đang chờ
+        self.batches = 0
+        self.items = 0
+
+    def submit(self, fn, args, item):
+        # fn(items, *args) -> [(kết quả, lỗi)], chạy trong process pool; trả về future của riêng item
+        loop = asyncio.get_running_loop()
+        key = (fn, args)
+        batch = self.pending.get(key)
+        if batch is None:
+            batch = self.pending[key] = {"items": [], "futures": [],
+                                         "timer": loop.call_later(self.window, self._flush, key)}
+        future = loop.create_future()
+        batch["items"].append(item)
+        batch["futures"].append(future)
+        if len(batch["items"]) >= self.max_batch:
+            self._flush(key)
+        return future
+
+    def _flush(self, key):
+        batch = self.pending.pop(key, None)
+        if batch is None:
+            return
+        batch["timer"].cancel()
+        self.batches += 1
+        self.items += len(batch["items"])
+        fn, args = key
+        task = asyncio.get_running_loop().run_in_executor(self.pool, fn, batch["items"], *args)
+        task.add_done_callback(lambda t: self._resolve(t, batch["futures"]))
+
+    @staticmethod
+    def _resolve(task, futures):
+        if task.cancelled():
+            for future in futures:
+                future.cancel()
+            return
+        if task.exception() is not None:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(task.exception())
+            return
+        for future, result in zip(futures, task.result()):
+            if not future.done():
+                future.set_result(result)
+
+# ==== Dịch vụ ====
+class CipherService:
+    def __init__(self, workers=None, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.batcher = RSABatcher(self.pool, window_ms, max_batch)
+        self.connections = 0
+        self.requests = 0
+
+    async def handle(self, reader, writer):
+        # Trạng thái riêng của kết nối: khóa đã đặt
+        state = {"playfair": None, "rsa": None}
+        write_lock = asyncio.Lock()
+        tasks = set()
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    request = await read_frame(reader)
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except (ProtocolError, ValueError) as ex:
+                    write_frame(writer, {"id": None, "ok": False, "error": f"{type(ex).__name__}: {ex}"})
+                    break
+                # Mỗi yêu cầu một task; các op đặt khóa đổi state trước lần await đầu tiên
+                # nên yêu cầu gửi sau vẫn thấy khóa mới (rsa_keygen đặt ngay một future,
+                # các yêu cầu RSA sau đó chờ khóa sinh xong)
+                task = asyncio.create_task(self.respond(request, state, writer, write_lock))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            self.connections -= 1
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def respond(self, request, state, writer, write_lock):
+        request_id = request.get("id") if isinstance(request, dict) else None
+        self.requests += 1
+        try:
+            if not isinstance(request, dict):
+                raise ProtocolError("Request must be a JSON object")
+            reply = {"id": request_id, "ok": True, "result": await self.dispatch(request, state)}
+        except Exception as ex:
+            reply = {"id": request_id, "ok": False, "error": f"{type(ex).__name__}: {ex}"}
+        async with write_lock:
+            try:
+                write_frame(writer, reply)
+                await writer.drain()
+            except ConnectionError:
+                pass
+
+    async def dispatch(self, request, state):
+        op = request.get("op")
+        if op == "ping":
+            return "pong"
+        if op == "stats":
+            return self.stats()
+        if op == "playfair_key":
+            state["playfair"] = get_cipher(str(request["key"]), int(request.get("size", 5)))
+            return {"matrix": [''.join(row) for row in state["playfair"].matrix]}
+        if op in ("playfair_encrypt", "playfair_decrypt"):
+            if "key" in request:
+                cipher = get_cipher(str(request["key"]), int(request.get("size", 5)))
+            else:
+                cipher = state["playfair"]
+            if cipher is None:
+                raise ValueError("No Playfair key: send playfair_key first")
+            text = str(request["text"])
+            return cipher.encrypt(text) if op == "playfair_encrypt" else cipher.decrypt(text)
+        if op == "rsa_key":
+            state["rsa"] = rsa_state(request)
+            return public_key(state["rsa"])
+        if op == "rsa_keygen":
+            # Sinh số nguyên tố đã tự chạy song song nhiều tiến trình, ở đây chỉ cần một luồng chờ
+            bits = int(request.get("bits", 2048))
+            if bits < MIN_KEYGEN_BITS:
+                # Số quá nhỏ thì không tìm được hai số nguyên tố khác nhau, vòng tìm không dừng
+                raise ValueError(f"Key size must be at least {MIN_KEYGEN_BITS} bits")
+            loop = asyncio.get_running_loop()
+            pending = loop.create_future()
+            # Tránh cảnh báo "exception was never retrieved" khi không yêu cầu nào chờ khóa này
+            pending.add_done_callback(lambda f: f.cancelled() or f.exception())
+            previous, state["rsa"] = state["rsa"], pending
+            try:
+                p, q = await loop.run_in_executor(None, generate_large_primes, bits)
+                key = rsa_state({"p": p, "q": q})
+            except Exception as ex:
+                # Yêu cầu đang chờ nhận lỗi; yêu cầu gửi sau dùng lại khóa trước đó
+                if state["rsa"] is pending:
+                    state["rsa"] = previous
+                pending.set_exception(ex)
+                raise
+            pending.set_result(key)
+            # Một rsa_key gửi sau (trong lúc đang sinh) được giữ nguyên
+            if state["rsa"] is pending:
+                state["rsa"] = key
+            result = public_key(key)
+            result.update(d=str(key["d"]), p=str(p), q=str(q))
+            return result
+        if op == "rsa_encrypt":
+            key = await require_rsa(state)
+            args = (key["e"], key["n"], request.get("mode", "block"), request.get("fmt", "binary"))
+            result, error = await self.batcher.submit(encrypt_chunk, args, str(request["text"]))
+        elif op == "rsa_decrypt":
+            key = await require_rsa(state)
+            if key["d"] is None:
+                raise ValueError("Connection has only a public RSA key")
+            result, error = await self.batcher.submit(decrypt_chunk, (key["d"], key["n"], key["crt"]),
+                                                      str(request["cipher"]))
+        else:
+            raise ProtocolError(f"Unknown op {op!r}")
+        if error:
+            raise ValueError(error)
+        return result
+
+    def stats(self):
+        batches = self.batcher.batches
+        return {"connections": self.connections, "requests": self.requests, "rsa_batches": batches,
+                "rsa_items": self.batcher.items,
+                "mean_batch": round(self.batcher.items / batches, 2) if batches else 0.0}
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+def rsa_state(request):
+    # Khóa của kết nối: từ (p, q) thì tính luôn d và tham số CRT; hoặc nhận thẳng (e, n[, d])
+    if "p" in request and "q" in request:
+        p, q = int(request["p"]), int(request["q"])
+        e, d, n, _ = generate_keys(p, q)
+        return {"e": e, "d": d, "n": n, "crt": crt_params(p, q, d)}
+    d = request.get("d")
+    return {"e": int(request["e"]), "d": int(d) if d is not None else None, "n": int(request["n"]), "crt": None}
+
+def public_key(key):
+    # Số lớn gửi dạng chuỗi để client ở ngôn ngữ khác không mất độ chính xác
+    return {"e": str(key["e"]), "n": str(key["n"])}
+
+async def require_rsa(state):
+    key = state["rsa"]
+    if key is None:
+        raise ValueError("No RSA key: send rsa_key or rsa_keygen first")
+    if isinstance(key, asyncio.Future):
+        # rsa_keygen của kết nối này chưa xong; lỗi sinh khóa được ném lại cho yêu cầu đang chờ
+        key = await key
+    return key
+
+# ==== Client ====
+class ServiceClient:
+    # Kết nối tới dịch vụ; call() có thể gọi đồng thời nhiều lần trên cùng kết nối
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count(1)
+        self.waiting = {}
+        self.listener = asyncio.create_task(self._listen())
+
+    @classmethod
+    async def connect(cls, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+        if unix:
+            reader, writer = await asyncio.open_unix_connection(unix)
+        else:
+            reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def _listen(self):
+        try:
+            while True:
+                reply = await read_frame(self.reader)
+                future = self.waiting.pop(reply.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result(reply)
+        except (asyncio.IncompleteReadError, ConnectionError) as ex:
+            for future in self.waiting.values():
+                if not future.done():
+                    future.set_exception(ConnectionError(f"Connection closed: {ex}"))
+            self.waiting.clear()
+
+    async def call(self, op, **fields):
+        # Trả về result, ném ValueError với thông báo lỗi của dịch vụ
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.waiting[request_id] = future
+        write_frame(self.writer, {"id": request_id, "op": op, **fields})
+        await self.writer.drain()
+        reply = await future
+        if not reply["ok"]:
+            raise ValueError(reply["error"])
+        return reply["result"]
+
+    async def close(self):
+        self.listener.cancel()
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+# ==== Chạy ====
+async def serve(service, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+    where = unix or ", ".join(str(sock.getsockname()) for sock in server.sockets)
+    print(f"Cipher service listening on {where}", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dịch vụ mã hóa Playfair/RSA cục bộ (asyncio)")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="đường dẫn Unix socket (thay cho TCP)")
+    parser.add_argument("--workers", type=int, help="số tiến trình cho RSA")
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW_MS)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args(argv)
+
+    service = CipherService(args.workers, args.batch_window_ms, args.max_batch)
+    try:
+        asyncio.run(serve(service, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.close()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())